@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""
+Measures deserialize_list on array strings as they come in reports.
+
+    python -m benchmarks.bench_deserialize_list
+"""
+import timeit
+
+from datagun import deserialize_list
+
+ROWS = 100000
+REPEAT = 5
+
+CASES = {
+    "ints": "[101, 202, 303, 404, 505, 606]",
+    "json strings": '["search", "display", "smart banner", "video"]',
+    "python strings": "['search', 'display', 'smart banner', 'video']",
+    "nested ints": "[[1, 2, 3], [4, 5], [6, 7, 8, 9]]",
+    "nested strings": "[['moscow', 'russia'], ['minsk', 'belarus']]",
+    "mixed quotes": '["item 1", \'","item 2 with "quotes"\', "item 3"]',
+    # Unescaped quotes inside items break the parsers, the lexer handles them.
+    "broken quotes": '["say "hello"", "buy "red" shoes", \'it\'s\']',
+    "long broken quotes": '["' + "x" * 200 + '", "say "hello""]',
+}
+
+
+def main():
+    for name, text in CASES.items():
+        values = [text] * ROWS
+        seconds = min(
+            timeit.repeat(
+                lambda: [deserialize_list(i) for i in values], number=1, repeat=REPEAT
+            )
+        )
+        print("{:<22}{:>8.3f} s{:>12,.0f} rows/s".format(name, seconds, ROWS / seconds))
+
+
+if __name__ == "__main__":
+    main()
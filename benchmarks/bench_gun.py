@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Compares converting a column value by value through Gun.__call__
+with converting it in one pass through Gun.map.
+
+    python -m benchmarks.bench_gun
+"""
+import timeit
+
+from datagun import Gun, Series
+
+ROWS = 1000000
+REPEAT = 5
+
+
+def make_values(rows):
+    values = [str(i) for i in range(rows)]
+    # Some nulls and errors, as in real reports.
+    for i in range(0, rows, 100):
+        values[i] = None
+    for i in range(50, rows, 1000):
+        values[i] = "error"
+    return values
+
+
+def bench(name, stmt):
+    seconds = min(timeit.repeat(stmt, number=1, repeat=REPEAT))
+    print("{:<30}{:>10.3f} s{:>14,.0f} rows/s".format(name, seconds, ROWS / seconds))
+    return seconds
+
+
+def main():
+    values = make_values(ROWS)
+    for func in (int, float):
+        print(func.__name__)
+        params = dict(func=func, errors="default", default_value=func(0))
+        call = bench("Gun.__call__", lambda: list(map(Gun(**params), values)))
+        map_ = bench("Gun.map", lambda: Gun(**params).map(values))
+        bench("Series", lambda: Series(values, dtype=func.__name__))
+        print("speedup {:.1f}x\n".format(call / map_))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Time of import datagun in a new interpreter, as paid by every short-lived process,
+and the modules that are loaded by it.
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --limit-ms 50
+
+With --limit-ms the exit code is 1, if the import is slower than the limit
+or loads a module of HEAVY_MODULES.
+"""
+import argparse
+import subprocess
+import sys
+
+REPEAT = 10
+# Loaded on first use only: datetime parsing, arrays, timezones, logging.
+HEAVY_MODULES = ("dateutil", "pytz", "json", "ast", "logging")
+
+SCRIPT = """
+import sys, time
+before = set(sys.modules)
+start = time.perf_counter()
+import datagun
+seconds = time.perf_counter() - start
+print(seconds)
+print(" ".join(sorted(set(sys.modules) - before)))
+"""
+
+
+def measure():
+    """Returns seconds of the import and the names of the modules loaded by it."""
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT], universal_newlines=True
+    )
+    seconds, modules = output.split("\n", 1)
+    return float(seconds), modules.split()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--limit-ms", type=float)
+    args = parser.parse_args(argv)
+
+    results = [measure() for _ in range(args.repeat)]
+    seconds = min(i[0] for i in results)
+    modules = results[0][1]
+    heavy = sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES))
+    print("{:<30}{:>10.1f} ms".format("import datagun", seconds * 1000))
+    print("{:<30}{:>10}".format("modules loaded", len(modules)))
+    if heavy:
+        print("heavy modules loaded: {}".format(", ".join(heavy)))
+
+    if args.limit_ms is not None and (heavy or seconds * 1000 > args.limit_ms):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
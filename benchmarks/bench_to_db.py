@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Inserts a report into an in-memory sqlite3 database through DataSet.to_db
+with different batch sizes and through executemany over to_values.
+
+    python -m benchmarks.bench_to_db
+"""
+import sqlite3
+import timeit
+
+from datagun import DataSet
+
+from . import generators
+
+ROWS = 500000
+REPEAT = 3
+BATCH_ROWS = (100, 1000, 10000, 100000)
+
+
+def make_dataset(rows):
+    columns, schema = generators.report_columns(rows)
+    # Arrays can not be bound as sqlite3 parameters.
+    return DataSet(columns[:-1], schema=schema[:-1], orient="columns")
+
+
+def connect():
+    connection = sqlite3.connect(":memory:")
+    connection.execute(
+        "CREATE TABLE report (campaign TEXT, date TEXT, clicks INTEGER, cost REAL)"
+    )
+    return connection
+
+
+def bench(name, func):
+    def run():
+        connection = connect()
+        func(connection)
+        connection.close()
+
+    seconds = min(timeit.repeat(run, number=1, repeat=REPEAT))
+    print("{:<30}{:>10.3f} s{:>14,.0f} rows/s".format(name, seconds, ROWS / seconds))
+    return seconds
+
+
+def main():
+    ds = make_dataset(ROWS)
+    query = "INSERT INTO report VALUES (?, ?, ?, ?)"
+    bench(
+        "executemany(to_values())",
+        lambda connection: connection.executemany(query, ds.to_values()),
+    )
+    for batch_rows in BATCH_ROWS:
+        bench(
+            "to_db(batch_rows={})".format(batch_rows),
+            lambda connection: ds.to_db(connection, "report", batch_rows=batch_rows),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Synthetic report data for the benchmarks. The same seed gives the same data."""
+import datetime as dt
+import random
+
+SEED = 0
+# Share of values that can not be converted.
+ERROR_RATE = 0.001
+
+
+def _random(seed=SEED):
+    return random.Random(seed)
+
+
+def _with_errors(values, rnd, error_value="error"):
+    for i in range(len(values)):
+        if rnd.random() < ERROR_RATE:
+            values[i] = error_value
+    return values
+
+
+def ints(rows, seed=SEED):
+    rnd = _random(seed)
+    return _with_errors([str(rnd.randint(0, 10 ** 6)) for _ in range(rows)], rnd)
+
+
+def floats(rows, seed=SEED):
+    rnd = _random(seed)
+    return _with_errors(
+        [str(round(rnd.uniform(0, 10 ** 4), 2)) for _ in range(rows)], rnd
+    )
+
+
+def datetimes(rows, distinct=365, dt_format="%Y-%m-%d %H:%M:%S", seed=SEED):
+    """Report dates have low cardinality: few distinct values in many rows."""
+    rnd = _random(seed)
+    start = dt.datetime(2020, 1, 1)
+    values = [
+        (start + dt.timedelta(hours=i * 7)).strftime(dt_format) for i in range(distinct)
+    ]
+    return _with_errors([rnd.choice(values) for _ in range(rows)], rnd)
+
+
+def strings(rows, distinct=50, seed=SEED):
+    rnd = _random(seed)
+    values = ["campaign {}".format(i) for i in range(distinct)]
+    return [rnd.choice(values) for _ in range(rows)]
+
+
+def arrays(rows, depth=1, length=4, seed=SEED):
+    """Arrays serialized as strings, the way they come in reports."""
+    rnd = _random(seed)
+
+    def make_array(level):
+        if level == 0:
+            return rnd.randint(0, 1000)
+        return [make_array(level - 1) for _ in range(rnd.randint(0, length))]
+
+    error_value = "[" * depth + "'error'" + "]" * depth
+    return _with_errors([str(make_array(depth)) for _ in range(rows)], rnd, error_value)
+
+
+def report_columns(rows, seed=SEED):
+    """Columns of a typical report and the schema for them."""
+    columns = [
+        strings(rows, seed=seed),
+        datetimes(rows, dt_format="%Y-%m-%d", seed=seed),
+        ints(rows, seed=seed),
+        floats(rows, seed=seed),
+        arrays(rows, seed=seed),
+    ]
+    schema = [
+        {"name": "campaign", "dtype": "string"},
+        {"name": "date", "dtype": "date", "dt_format": "%Y-%m-%d"},
+        {"name": "clicks", "dtype": "int"},
+        {"name": "cost", "dtype": "float"},
+        {"name": "goals", "dtype": "int", "depth": 1},
+    ]
+    return columns, schema
+
+
+def report_text(rows, seed=SEED):
+    """Report as TSV text with a header."""
+    columns, schema = report_columns(rows, seed=seed)
+    lines = ["\t".join(i["name"] for i in schema)]
+    lines.extend("\t".join(row) for row in zip(*columns))
+    return "\n".join(lines) + "\n", schema
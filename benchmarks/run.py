@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the conversion hot paths: throughput and peak memory.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --rows 100000 datetime array
+    python -m benchmarks.run --save before.json
+    python -m benchmarks.run --compare before.json --tolerance 0.2
+
+With --compare the exit code is 1, if some case became slower than the tolerance.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from datagun import DataSet, Series, deserialize_list, read_text
+
+from . import generators
+
+CASES = {}
+
+
+def case(name):
+    """Registers a benchmark: a function that takes the number of rows
+    and returns a function to measure."""
+
+    def decorator(func):
+        CASES[name] = func
+        return func
+
+    return decorator
+
+
+def _series_case(name, dtype, make_values, **params):
+    @case(name)
+    def prepare(rows):
+        values = make_values(rows)
+        return lambda: Series(values, dtype=dtype, **params)
+
+
+_series_case("int", "int", generators.ints)
+_series_case("float", "float", generators.floats)
+_series_case("string", "string", generators.strings)
+_series_case(
+    "datetime",
+    "datetime",
+    generators.datetimes,
+    dt_format="%Y-%m-%d %H:%M:%S",
+)
+_series_case("datetime parse", "datetime", generators.datetimes)
+_series_case(
+    "array depth 1", "int", lambda rows: generators.arrays(rows, depth=1), depth=1
+)
+_series_case(
+    "array depth 2", "int", lambda rows: generators.arrays(rows, depth=2), depth=2
+)
+
+
+@case("deserialize_list")
+def _(rows):
+    values = generators.arrays(rows, depth=2)
+    return lambda: [deserialize_list(i) for i in values]
+
+
+@case("read_text")
+def _(rows):
+    text, schema = generators.report_text(rows)
+    return lambda: read_text(text, schema=[dict(i) for i in schema], skip_begin_lines=1)
+
+
+def _report(rows):
+    columns, schema = generators.report_columns(rows)
+    return DataSet(columns, schema=schema, orient="columns")
+
+
+@case("get_errors")
+def _(rows):
+    ds = _report(rows)
+    return ds.get_errors
+
+
+@case("to_text")
+def _(rows):
+    ds = _report(rows)
+    return ds.to_text
+
+
+@case("to_dict")
+def _(rows):
+    ds = _report(rows)
+    return ds.to_dict
+
+
+@case("distinct")
+def _(rows):
+    ds = _report(rows)[["campaign", "date"]]
+    return ds.distinct
+
+
+@case("groupby")
+def _(rows):
+    ds = _report(rows)
+    return lambda: ds.groupby(["date", "campaign"]).agg(
+        {"clicks": "sum", "cost": ["sum", "mean"], "goals": "count"}
+    )
+
+
+@case("sort_values")
+def _(rows):
+    ds = _report(rows)
+    return lambda: ds.sort_values(["date", "cost"], ascending=[True, False])
+
+
+@case("nlargest")
+def _(rows):
+    ds = _report(rows)
+    return lambda: ds.nlargest(10, "cost")
+
+
+def measure(func, repeat):
+    """Returns the best time of several runs and the peak memory of one run."""
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(seconds), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("cases", nargs="*", help="names of cases, by default all")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", help="save the results to a JSON file")
+    parser.add_argument("--compare", help="compare with the results from a JSON file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown relative to --compare, 0.2 = 20%%",
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.cases) - set(CASES)
+    if unknown:
+        parser.error("unknown cases: {}".format(", ".join(sorted(unknown))))
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(
+        "{:<18}{:>10}{:>14}{:>12}{:>10}".format(
+            "case", "seconds", "rows/s", "peak MB", "change"
+        )
+    )
+    for name in args.cases or CASES:
+        seconds, peak = measure(CASES[name](args.rows), args.repeat)
+        results[name] = {"rows": args.rows, "seconds": seconds, "peak_bytes": peak}
+
+        change = ""
+        if name in baseline and baseline[name]["rows"] == args.rows:
+            ratio = seconds / baseline[name]["seconds"] - 1
+            change = "{:+.0%}".format(ratio)
+            if ratio > args.tolerance:
+                regressions.append(name)
+        print(
+            "{:<18}{:>10.3f}{:>14,.0f}{:>12.1f}{:>10}".format(
+                name, seconds, args.rows / seconds, peak / 2 ** 20, change
+            )
+        )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        print("Slower than {}: {}".format(args.compare, ", ".join(regressions)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,4 +4,16 @@ __author__ = 'Pavel Maksimov'
 __email__ = 'vur21@ya.com'
 __version__ = '0.1.1'
 
-from .datagun import Series, DataSet, read_text, deserialize_list, Gun, NULL_VALUES
+from .datagun import (
+    Series,
+    DataSet,
+    Schema,
+    Aggregation,
+    ConversionStats,
+    read_text,
+    read_text_chunks,
+    read_jsonl,
+    deserialize_list,
+    Gun,
+    NULL_VALUES,
+)
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Reading of text streams in asyncio, for example responses of HTTP APIs.
+
+The text is split into rows in the event loop, the rows are converted into DataSet
+in an executor, so the loop is not blocked by the conversion.
+Requires python 3.6+, that is why the module is not imported by datagun.
+
+    async for ds in read_stream_chunks(reader, schema=schema):
+        ...
+"""
+import asyncio
+import codecs
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .datagun import READ_BLOCK_SIZE, DataSet, _TextParser, _compile_schema
+
+
+async def _iter_text(stream, encoding):
+    """Iterates the stream by pieces of text, bytes are decoded."""
+    if hasattr(stream, "read"):
+
+        async def iter_pieces():
+            while True:
+                piece = await stream.read(READ_BLOCK_SIZE)
+                if not piece:
+                    break
+                yield piece
+
+        pieces = iter_pieces()
+    else:
+        pieces = stream
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    async for piece in pieces:
+        if isinstance(piece, bytes):
+            piece = decoder.decode(piece)
+        if piece:
+            yield piece
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def read_stream_chunks(
+    stream,
+    chunk_rows=100000,
+    sep="\t",
+    schema=None,
+    newline="\n",
+    skip_blank_lines=True,
+    skip_begin_lines=0,
+    skip_end_lines=0,
+    encoding="utf-8",
+    executor=None,
+    max_pending=2,
+    **kwargs
+):
+    """
+    Reads the text stream and returns it by chunks of DataSet, like read_text_chunks.
+
+    The stream is not read further while max_pending chunks are converted
+    or wait for the consumer, so a slow consumer limits the memory used.
+
+    :param stream: asyncio.StreamReader or any object with a coroutine read(n),
+        async iterator of bytes or str, pieces of the text of any length
+    :param chunk_rows: int, max number of rows in one DataSet
+    :param encoding: str, used for bytes
+    :param executor: concurrent.futures.Executor, converts the chunks in it,
+        the default executor of the loop is used by default.
+        A process pool converts the columns like DataSet with executor,
+        functions in the schema must be strings or module level functions then
+    :param max_pending: int, max number of chunks converted at the same time
+    :param kwargs: series params passed to each DataSet
+    :return: async generator of DataSet
+    """
+    if chunk_rows < 1:
+        raise ValueError("chunk_rows must be greater than 0")
+    if max_pending < 1:
+        raise ValueError("max_pending must be greater than 0")
+    schema = _compile_schema(schema)
+
+    loop = asyncio.get_event_loop()
+    parser = _TextParser(
+        sep=sep,
+        newline=newline,
+        skip_blank_lines=skip_blank_lines,
+        skip_begin_lines=skip_begin_lines,
+        skip_end_lines=skip_end_lines,
+    )
+    if isinstance(executor, ProcessPoolExecutor):
+        # Series with functions from the schema can not be passed back from a process,
+        # so the columns are converted in the processes by DataSet, like with workers,
+        # and the chunk is put together in a thread.
+        convert = partial(
+            DataSet, schema=schema, orient="values", executor=executor, **kwargs
+        )
+        executor = None
+    else:
+        convert = partial(DataSet, schema=schema, orient="values", **kwargs)
+    pending = deque()
+    buffer = []
+
+    def submit(rows):
+        pending.append(loop.run_in_executor(executor, convert, rows))
+
+    try:
+        async for text in _iter_text(stream, encoding):
+            buffer.extend(parser.feed(text))
+            while len(buffer) >= chunk_rows:
+                submit(buffer[:chunk_rows])
+                del buffer[:chunk_rows]
+                if len(pending) >= max_pending:
+                    yield await pending.popleft()
+
+        buffer.extend(parser.close())
+        if buffer:
+            submit(buffer)
+            buffer = []
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # The consumer stopped early or the stream failed.
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+Serialization of DataSet into ClickHouse input formats:
+TabSeparated, TabSeparatedWithNames and RowBinary.
+
+Values are written by the ClickHouse type of the column. By default it is derived
+from dtype, depth and allow_null of the series, or from all the values,
+if the series has no dtype or keeps values that were not converted (errors="ignore").
+Naive datetimes are treated as UTC. DateTime is written as unix seconds in all formats,
+so the server timezone does not change the instant, unlike the text of the datetime.
+None in a column of a not Nullable type is written as the default of the type,
+like ClickHouse does with input_format_null_as_default.
+"""
+import calendar
+import datetime as dt
+import struct
+
+from .datagun import _text_writer, deserialize_list
+
+FORMATS = ("TabSeparated", "TabSeparatedWithNames", "RowBinary")
+
+DTYPE_TYPES = {
+    "int": "Int64",
+    "uint": "UInt64",
+    "float": "Float64",
+    "timestamp": "Float64",
+    "date": "Date",
+    "datetime": "DateTime",
+}
+PYTHON_TYPES = {
+    bool: "UInt8",
+    int: "Int64",
+    float: "Float64",
+    dt.date: "Date",
+    dt.datetime: "DateTime",
+}
+INT_FORMATS = {
+    "Int8": "<b",
+    "Int16": "<h",
+    "Int32": "<i",
+    "Int64": "<q",
+    "UInt8": "<B",
+    "UInt16": "<H",
+    "UInt32": "<I",
+    "UInt64": "<Q",
+    "Bool": "<B",
+}
+FLOAT_FORMATS = {"Float32": "<f", "Float64": "<d"}
+
+EPOCH_DATE = dt.date(1970, 1, 1)
+ESCAPES = str.maketrans(
+    {
+        "\\": "\\\\",
+        "\t": "\\t",
+        "\n": "\\n",
+        "\r": "\\r",
+        "\b": "\\b",
+        "\f": "\\f",
+        "\0": "\\0",
+        "'": "\\'",
+    }
+)
+
+
+def _parse_type(type_name):
+    """Returns a pair of the type and the type of its elements,
+    for example Array(Nullable(Int64)) -> ("Array", "Nullable(Int64)")."""
+    type_name = type_name.strip()
+    for wrapper in ("Nullable", "Array"):
+        if type_name.startswith(wrapper + "(") and type_name.endswith(")"):
+            return wrapper, type_name[len(wrapper) + 1 : -1]
+    return type_name, None
+
+
+def _as_list(value):
+    """Arrays of series without dtype may be left as text."""
+    return deserialize_list(value) if isinstance(value, str) else value
+
+
+def _infer_type(values):
+    """
+    Returns the type that fits all values that are not None.
+    Int is widened to float, other mixed types are written as String.
+    """
+    types = set()
+    items = []
+    for value in values:
+        if value is None:
+            continue
+        elif isinstance(value, list):
+            types.add(list)
+            items.extend(value)
+        else:
+            types.add(PYTHON_TYPES.get(type(value), "String"))
+        if len(types) > 2:
+            return "String"
+
+    if types == {list}:
+        return "Array({})".format(_infer_type(items))
+    elif types == {"Int64", "Float64"}:
+        return "Float64"
+    elif len(types) == 1:
+        return types.pop()
+    return "String"
+
+
+def column_type(series):
+    """Returns the ClickHouse type of the series."""
+    if series._dtype in DTYPE_TYPES and series.errors != "ignore":
+        type_name = DTYPE_TYPES[series._dtype]
+    elif series._dtype in DTYPE_TYPES or series._dtype is None:
+        values = iter(series.data())
+        for _ in range(series.depth):
+            values = (item for array in values if array for item in _as_list(array))
+        type_name = _infer_type(values)
+    else:
+        type_name = "String"
+
+    if series.allow_null:
+        type_name = "Nullable({})".format(type_name)
+    for _ in range(series.depth):
+        type_name = "Array({})".format(type_name)
+    return type_name
+
+
+def column_types(dataset):
+    return [column_type(series) for series in dataset]
+
+
+def _utc_datetime(value):
+    if not isinstance(value, dt.datetime):
+        return dt.datetime(value.year, value.month, value.day)
+    elif value.tzinfo is not None:
+        return value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _unix_seconds(value):
+    """Returns the DateTime value of ClickHouse, seconds since the epoch in UTC."""
+    seconds = calendar.timegm(_utc_datetime(value).timetuple())
+    if not 0 <= seconds < 2 ** 32:
+        raise OverflowError("The datetime is out of the range of DateTime")
+    return seconds
+
+
+def _text_formatter(type_name, quoted=False):
+    """
+    Returns a function that formats a value of the type for TabSeparated.
+
+    :param quoted: bool, the value is an element of an array,
+        strings and dates are quoted then
+    """
+    kind, item_type = _parse_type(type_name)
+    null = "NULL" if quoted else "\\N"
+    quote = "'" if quoted else ""
+
+    if kind == "Nullable":
+        func = _text_formatter(item_type, quoted)
+    elif kind == "Array":
+        item_func = _text_formatter(item_type, quoted=True)
+        func = lambda value: "[{}]".format(",".join(map(item_func, _as_list(value))))
+    elif kind in INT_FORMATS:
+        func = "{:d}".format
+    elif kind in FLOAT_FORMATS:
+        func = lambda value: repr(float(value))
+    elif kind == "Date":
+        func = lambda value: "{}{:04d}-{:02d}-{:02d}{}".format(
+            quote, value.year, value.month, value.day, quote
+        )
+    elif kind == "DateTime":
+        func = lambda value: "{}{:d}{}".format(quote, _unix_seconds(value), quote)
+    elif kind == "String":
+        func = lambda value: quote + str(value).translate(ESCAPES) + quote
+    else:
+        raise ValueError("{} = неподдерживаемый тип".format(type_name))
+
+    return lambda value: null if value is None else func(value)
+
+
+def _varint(number):
+    """LEB128, the length of strings and arrays in RowBinary."""
+    result = bytearray()
+    while number > 0x7F:
+        result.append(number & 0x7F | 0x80)
+        number >>= 7
+    result.append(number)
+    return bytes(result)
+
+
+def _binary_formatter(type_name):
+    """Returns a function that packs a value of the type for RowBinary."""
+    kind, item_type = _parse_type(type_name)
+
+    if kind == "Nullable":
+        item_func = _binary_formatter(item_type)
+        return lambda value: b"\x01" if value is None else b"\x00" + item_func(value)
+    elif kind == "Array":
+        item_func = _binary_formatter(item_type)
+
+        def func(value):
+            value = _as_list(value)
+            return _varint(len(value)) + b"".join(map(item_func, value))
+
+        default = []
+    elif kind in INT_FORMATS:
+        func = struct.Struct(INT_FORMATS[kind]).pack
+        default = 0
+    elif kind in FLOAT_FORMATS:
+        pack = struct.Struct(FLOAT_FORMATS[kind]).pack
+        func = lambda value: pack(float(value))
+        default = 0.0
+    elif kind == "Date":
+        pack = struct.Struct("<H").pack
+        func = lambda value: pack(
+            (dt.date(value.year, value.month, value.day) - EPOCH_DATE).days
+        )
+        default = EPOCH_DATE
+    elif kind == "DateTime":
+        pack = struct.Struct("<I").pack
+        func = lambda value: pack(_unix_seconds(value))
+        default = EPOCH_DATE
+    elif kind == "String":
+
+        def func(value):
+            value = str(value).encode("utf-8")
+            return _varint(len(value)) + value
+
+        default = ""
+    else:
+        raise ValueError("{} = неподдерживаемый тип".format(type_name))
+
+    default_bytes = func(default)
+    return lambda value: default_bytes if value is None else func(value)
+
+
+def _format_rows(funcs, rows, columns, types, start):
+    """
+    Returns the values of the rows formatted by funcs.
+    A value that does not fit its type raises ValueError with the column and the row.
+    """
+    try:
+        return [[func(value) for func, value in zip(funcs, row)] for row in rows]
+    except (ValueError, TypeError, OverflowError, AttributeError, struct.error):
+        pass
+
+    for index, row in enumerate(rows, start):
+        for func, value, col_name, type_name in zip(funcs, row, columns, types):
+            try:
+                func(value)
+            except (ValueError, TypeError, OverflowError, AttributeError, struct.error):
+                raise ValueError(
+                    "Value {!r} of column {} in row {} can not be written as {}".format(
+                        value, col_name, index, type_name
+                    )
+                )
+    raise AssertionError("The error was not reproduced")
+
+
+def write(dataset, fileobj, fmt="TabSeparated", types=None, chunk_rows=10000):
+    """
+    Writes the rows in the ClickHouse format by chunks of rows.
+
+    :param fileobj: file object, in binary mode for RowBinary
+    :param fmt: str, TabSeparated|TabSeparatedWithNames|RowBinary
+    :param types: list of str, ClickHouse types of the columns,
+        by default they are derived from the series
+    :param chunk_rows: int, number of rows formatted and written at once.
+        On a value that does not fit its type ValueError is raised,
+        the chunks before it are already written then
+    """
+    if fmt not in FORMATS:
+        raise ValueError("{} = неверный fmt".format(fmt))
+    if types is None:
+        types = column_types(dataset)
+    elif len(types) != len(dataset.columns):
+        raise ValueError("The number of types does not match the number of columns")
+
+    columns = dataset.columns
+    if fmt == "RowBinary":
+        funcs = [_binary_formatter(type_name) for type_name in types]
+        start = 0
+        for batch in dataset.iter_batches(chunk_rows):
+            rows = _format_rows(funcs, batch, columns, types, start)
+            fileobj.write(b"".join(value for row in rows for value in row))
+            start += len(batch)
+        return
+
+    write_text = _text_writer(fileobj)
+    funcs = [_text_formatter(type_name) for type_name in types]
+    if fmt == "TabSeparatedWithNames":
+        write_text("\t".join(_text_formatter("String")(i) for i in columns))
+        write_text("\n")
+    start = 0
+    for batch in dataset.iter_batches(chunk_rows):
+        rows = _format_rows(funcs, batch, columns, types, start)
+        write_text("".join("\t".join(row) + "\n" for row in rows))
+        start += len(batch)
@@ -1,18 +1,87 @@
 # -*- coding: utf-8 -*-
-import ast
+import array
+import bisect
+import contextlib
 import datetime as dt
-import logging
-import re
+import heapq
+import importlib
+import io
+import operator
+import os
 import sys
-from collections.abc import Iterable
-
-import pytz
-from dateutil import parser as dt_parser
-
-logging.basicConfig(level=logging.INFO)
+import time
+from collections import deque, namedtuple
+from collections.abc import Iterable, Iterator
+from itertools import compress
+from functools import lru_cache, partial
 
 ONLY_SERIES_ERROR = "Only Accepts Series"
 NULL_VALUES = {None, "", "NULL", "none", "None", "null"}
+READ_BLOCK_SIZE = 1024 * 1024
+# Params of DataSet set in the schema of all series.
+SERIES_PARAMS = frozenset(
+    {
+        "errors",
+        "depth",
+        "allow_null",
+        "null_value",
+        "null_values",
+        "clear_values",
+        "timezone",
+        "storage",
+        "lazy",
+    }
+)
+# Rows in the first chunk of readers with max_memory_bytes,
+# its size sets the next chunks.
+MEMORY_PROBE_ROWS = 100
+# Columns longer than this are converted by several workers in parts.
+WORKER_CHUNK_ROWS = 100000
+# The number of distinct strings whose parsed datetime is remembered.
+DATETIME_CACHE_SIZE = 10000
+# Formats tried when dt_format="infer".
+DATETIME_FORMATS = (
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d %H:%M",
+    "%Y%m%d",
+    "%Y/%m/%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%d.%m.%Y",
+    "%d.%m.%Y %H:%M:%S",
+    "%m/%d/%Y",
+    "%m/%d/%Y %H:%M:%S",
+)
+
+
+# Measurements of a conversion passed to stats_callback.
+# stage = series|columns|dataset, seconds = wall time,
+# errors = error values of a series, rows with errors and dropped rows of a dataset,
+# cache_hits and cache_misses = of the caches of parsed datetimes.
+ConversionStats = namedtuple(
+    "ConversionStats",
+    "stage name dtype rows seconds nulls errors cache_hits cache_misses",
+)
+
+
+def _ignore_stats(stats):
+    """Makes a series collect stats, which are passed on by the caller."""
+
+
+def _sum_stats(stage, name, dtype, stats_list, seconds=None):
+    """Returns the stats of stats_list added together, None values are skipped."""
+    fields = {}
+    for field in ("rows", "seconds", "nulls", "errors", "cache_hits", "cache_misses"):
+        values = [
+            getattr(i, field) for i in stats_list if getattr(i, field) is not None
+        ]
+        fields[field] = sum(values) if values else None
+    if seconds is not None:
+        fields["seconds"] = seconds
+    return ConversionStats(stage=stage, name=name, dtype=dtype, **fields)
 
 
 class dtype_default_value:
@@ -23,68 +92,195 @@ class dtype_default_value:
         return "dtype_default_value"
 
 
-def deserialize_list(text):
-    """Вытащит массив из строки"""
+@lru_cache(maxsize=None)
+def _import_module(name):
+    """
+    Heavy modules are imported on first use, so that short-lived processes
+    which do not parse datetimes or arrays do not pay for them.
+    """
+    return importlib.import_module(name)
 
-    def _to_list(x):
-        x = re.sub(r"^\[", "", x)
-        x = re.sub(r"\]$", "", x)
-        x = x.replace("\\'", "'")
-        # This lexer takes a JSON-like 'array' string and converts single-quoted array items into escaped double-quoted items,
-        # then puts the 'array' into a python list
-        # Issues such as  ["item 1", '","item 2 including those double quotes":"', "item 3"] are resolved with this lexer
-        items = []  # List of lexed items
-        item = ""  # Current item container
-        dq = True  # Double-quotes active (False->single quotes active)
-        bs = 0  # backslash counter
-        in_item = (
-            False
-        )  # True if currently lexing an item within the quotes (False if outside the quotes; ie comma and whitespace)
-        for i, c in enumerate(x):  # Assuming encasement by brackets
-            if c == "\\":
-                # if there are backslashes, count them! Odd numbers escape the quotes...
-                bs += 1
-                continue
-            if ((dq and c == '"') or (not dq and c == "'")) and (
-                not in_item or i + 1 == len(x) or x[i + 1] == ","
-            ):  # quote matched at start/end of an item
-                if (
-                    bs & 1 == 1
-                ):  # if escaped quote, ignore as it must be part of the item
-                    continue
-                else:  # not escaped quote - toggle in_item
-                    in_item = not in_item
-                    if item != "":  # if item not empty, we must be at the end
-                        items += [item]  # so add it to the list of items
-                        item = ""  # and reset for the next item
-                    else:
-                        if not in_item:
-                            items.append("")
-                    continue
-            if not in_item:  # toggle of single/double quotes to enclose items
-                if dq and c == "'":
-                    dq = False
-                    in_item = True
-                elif not dq and c == '"':
-                    dq = True
-                    in_item = True
-                continue
-            if in_item:  # character is part of an item, append it to the item
-                if not dq and c == '"':  # if we are using single quotes
-                    item += bs * "\\" + '"'  # escape double quotes for JSON
-                else:
-                    item += bs * "\\" + c
-                bs = 0
-                continue
-        return items
 
-    def _to_json(x):
+def _logger():
+    return _import_module("logging").getLogger(__name__)
+
+
+# Two defaults of dateutil, the result of a text missing some date parts
+# differs between them, dateutil fills such parts from today.
+_DATETIME_DEFAULTS = (dt.datetime(2000, 1, 1), dt.datetime(2001, 3, 3))
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _parse_full_datetime(text):
+    """Returns None, if the datetime of the text depends on the current date."""
+    parse = _import_module("dateutil.parser").parse
+    try:
+        first, second = (parse(text, default=i) for i in _DATETIME_DEFAULTS)
+    except (ValueError, OverflowError):
+        return None
+    return first if first == second else None
+
+
+def _parse_datetime(text):
+    datetime = _parse_full_datetime(text)
+    if datetime is None:
+        datetime = _import_module("dateutil.parser").parse(text)
+    return datetime
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def _strptime(text, dt_format):
+    return dt.datetime.strptime(text, dt_format)
+
+
+def _datetime_cache_info():
+    """Returns hits and misses of the caches of parsed datetimes."""
+    infos = [_parse_full_datetime.cache_info(), _strptime.cache_info()]
+    return sum(i.hits for i in infos), sum(i.misses for i in infos)
+
+
+def _parse_datetime_as(text, dt_format):
+    try:
+        return _strptime(text, dt_format)
+    except ValueError:
+        return _parse_datetime(text)
+
+
+def _infer_datetime_format(
+    values, skip_values=(), sample_size=100, max_scan_size=10000
+):
+    """
+    Returns the first of DATETIME_FORMATS by which the sample of values
+    is parsed in the same way as by dateutil, or None.
+    Values that dateutil can not parse are not sampled, they fall back to it anyway.
+
+    :param skip_values: null values and values to clear, they are not sampled
+    """
+    is_skipped = _contains_func(skip_values)
+    sample = {}
+    for value in values[:max_scan_size]:
+        if (
+            not isinstance(value, str)
+            or not value
+            or value in sample
+            or is_skipped(value)
+        ):
+            continue
+        try:
+            sample[value] = _parse_datetime(value)
+        except (ValueError, OverflowError):
+            continue
+        if len(sample) >= sample_size:
+            break
+    if not sample:
+        return None
+
+    for dt_format in DATETIME_FORMATS:
         try:
-            return ast.literal_eval(x)
-        except SyntaxError:
-            return _to_list(x)
+            if all(_strptime(i, dt_format) == parsed for i, parsed in sample.items()):
+                return dt_format
+        except (ValueError, OverflowError):
+            continue
+
+    return None
+
+
+def _lex_list(text):
+    """
+    Takes a JSON-like 'array' string and puts the quoted items into a python list.
+    Issues such as  ["item 1", '","item 2 including those double quotes":"', "item 3"]
+    are resolved with this lexer.
+    Items are sliced from the text, not collected by chars.
+    """
+    if text.startswith("["):
+        text = text[1:]
+    if text.endswith("]"):
+        text = text[:-1]
+    elif text.endswith("]\n"):
+        text = text[:-2] + "\n"
+    text = text.replace("\\'", "'")
+
+    items = []  # List of lexed items
+    item_parts = []  # Pieces of the current item
+    dq = True  # Double-quotes active (False->single quotes active)
+    bs = 0  # backslash counter
+    # True if currently lexing an item within the quotes
+    # (False if outside the quotes; ie comma and whitespace)
+    in_item = False
+    length = len(text)
+    i = 0
+    while i < length:
+        c = text[i]
+        if c == "\\":
+            # if there are backslashes, count them! Odd numbers escape the quotes...
+            bs += 1
+            i += 1
+            continue
+
+        quote = '"' if dq else "'"
+        if c == quote and (not in_item or i + 1 == length or text[i + 1] == ","):
+            # quote matched at start/end of an item
+            if not bs & 1:  # not escaped quote - toggle in_item
+                in_item = not in_item
+                if item_parts:  # if item not empty, we must be at the end
+                    items.append("".join(item_parts))
+                    item_parts = []
+                elif not in_item:
+                    items.append("")
+            # escaped quote is ignored as it must be part of the item
+            i += 1
+            continue
+
+        if not in_item:  # toggle of single/double quotes to enclose items
+            if dq and c == "'":
+                dq = False
+                in_item = True
+            elif not dq and c == '"':
+                dq = True
+                in_item = True
+            i += 1
+            continue
+
+        # Characters up to the next backslash or quote are part of the item.
+        end = text.find(quote, i + 1)
+        end_backslash = text.find("\\", i + 1, length if end == -1 else end)
+        if end_backslash != -1:
+            end = end_backslash
+        elif end == -1:
+            end = length
+        if bs:
+            item_parts.append(bs * "\\")
+            bs = 0
+        item_parts.append(text[i:end])
+        i = end
+
+    return items
+
+
+def deserialize_list(text):
+    """Вытащит массив из строки"""
+    if isinstance(text, str) and text.startswith("["):
+        # Failed json.loads is not cheap,
+        # so it is tried only for arrays that look like JSON.
+        # Single-quoted strings without escapes are read the same way
+        # as by literal_eval.
+        if "'" not in text:
+            json_text = text
+        elif '"' not in text and "\\" not in text:
+            json_text = text.replace("'", '"')
+        else:
+            json_text = None
+
+        if json_text is not None:
+            try:
+                return _import_module("json").loads(json_text)
+            except ValueError:
+                pass
 
-    return _to_json(text)
+    try:
+        return _import_module("ast").literal_eval(text)
+    except SyntaxError:
+        return _lex_list(text)
 
 
 def read_text(
@@ -95,13 +291,773 @@ def read_text(
     skip_blank_lines=True,
     skip_begin_lines=0,
     skip_end_lines=0,
+    workers=None,
+    executor=None,
 ):
     data = [i.split(sep) for i in text.split(newline)]
     data = data[skip_begin_lines : -1 - skip_end_lines]
     if skip_blank_lines:
         data = [i for i in data if i]
 
-    return DataSet(data=data, schema=schema, orient="values")
+    return DataSet(
+        data=data, schema=schema, orient="values", workers=workers, executor=executor
+    )
+
+
+class _TextParser:
+    """Splits text fed in pieces into rows, without keeping the whole text."""
+
+    def __init__(
+        self,
+        sep="\t",
+        newline="\n",
+        skip_blank_lines=True,
+        skip_begin_lines=0,
+        skip_end_lines=0,
+    ):
+        self.sep = sep
+        self.newline = newline
+        self.skip_blank_lines = skip_blank_lines
+        self._skip_begin_lines = skip_begin_lines
+        self._skip_end_lines = skip_end_lines
+        # Lines that may turn out to be the last ones and must be skipped.
+        self._held_lines = deque()
+        # Incomplete line at the end of the last piece of text.
+        self._tail = ""
+
+    def _to_rows(self, lines):
+        if self._skip_begin_lines:
+            count_skip = min(self._skip_begin_lines, len(lines))
+            self._skip_begin_lines -= count_skip
+            lines = lines[count_skip:]
+
+        if self._skip_end_lines:
+            self._held_lines.extend(lines)
+            count_ready = max(len(self._held_lines) - self._skip_end_lines, 0)
+            lines = [self._held_lines.popleft() for _ in range(count_ready)]
+
+        sep = self.sep
+        if self.skip_blank_lines:
+            return [line.split(sep) for line in lines if line]
+        return [line.split(sep) for line in lines]
+
+    def feed(self, text):
+        """Returns the rows completed by this piece of text."""
+        lines = (self._tail + text).split(self.newline)
+        self._tail = lines.pop()
+        return self._to_rows(lines)
+
+    def close(self):
+        """Returns the last rows. A line without a trailing newline is a row too."""
+        lines = [self._tail] if self._tail else []
+        self._tail = ""
+        rows = self._to_rows(lines)
+        self._held_lines.clear()
+        return rows
+
+
+@contextlib.contextmanager
+def _open_text(filepath_or_buffer, encoding="utf-8"):
+    if isinstance(filepath_or_buffer, (str, bytes, os.PathLike)):
+        with open(filepath_or_buffer, "r", encoding=encoding, newline="") as f:
+            yield f
+    elif isinstance(filepath_or_buffer.read(0), bytes):
+        f = io.TextIOWrapper(filepath_or_buffer, encoding=encoding, newline="")
+        try:
+            yield f
+        finally:
+            # The caller owns the file object, so it must stay open.
+            f.detach()
+    else:
+        yield filepath_or_buffer
+
+
+def _text_writer(fileobj, encoding="utf-8"):
+    """Returns a function writing str to a file object in text or binary mode."""
+    if isinstance(fileobj, (io.RawIOBase, io.BufferedIOBase)) or "b" in getattr(
+        fileobj, "mode", ""
+    ):
+        return lambda text: fileobj.write(text.encode(encoding))
+    return fileobj.write
+
+
+def _split_chunks(row_batches, chunk_rows):
+    """
+    Regroups batches of rows of any length into chunks of chunk_rows rows.
+
+    :param chunk_rows: _ChunkBudget, its rows are read for each chunk
+    """
+    buffer = []
+    for rows in row_batches:
+        buffer.extend(rows)
+        while len(buffer) >= chunk_rows.rows:
+            limit = chunk_rows.rows
+            yield buffer[:limit]
+            del buffer[:limit]
+    if buffer:
+        yield buffer
+
+
+class _ChunkBudget:
+    """
+    Number of rows in chunks, so that a converted chunk takes about max_memory_bytes.
+    It is estimated by the memory of the previous chunk.
+    Without max_memory_bytes it is always chunk_rows.
+    """
+
+    def __init__(self, chunk_rows, max_memory_bytes=None):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows must be greater than 0")
+        self.chunk_rows = chunk_rows
+        self.max_memory_bytes = max_memory_bytes
+        if max_memory_bytes:
+            self.rows = min(chunk_rows, MEMORY_PROBE_ROWS)
+        else:
+            self.rows = chunk_rows
+
+    def update(self, dataset):
+        if not self.max_memory_bytes or not len(dataset):
+            return
+        row_bytes = dataset.memory_usage(deep=True) / len(dataset)
+        rows = int(self.max_memory_bytes / row_bytes)
+        self.rows = max(1, min(self.chunk_rows, rows))
+
+
+def _compile_schema(schema):
+    """Returns the schema prepared once for all chunks of a reader."""
+    if schema and not isinstance(schema, Schema):
+        return Schema(schema)
+    return schema
+
+
+def _iter_dataset_chunks(
+    row_batches,
+    orient,
+    schema=None,
+    chunk_rows=100000,
+    max_memory_bytes=None,
+    workers=None,
+    executor=None,
+    **kwargs
+):
+    """
+    Regroups batches of rows into chunks and converts each of them into DataSet,
+    the common part of the readers.
+
+    :param row_batches: iterable of lists of rows in the orient of DataSet
+    :param workers: int, converts columns in a pool of so many processes,
+        the pool is shared by all chunks
+    :return: generator of DataSet
+    """
+    if workers and executor is None:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from _iter_dataset_chunks(
+                row_batches,
+                orient,
+                schema=schema,
+                chunk_rows=chunk_rows,
+                max_memory_bytes=max_memory_bytes,
+                executor=executor,
+                **kwargs
+            )
+        return
+
+    schema = _compile_schema(schema)
+    chunk_rows = _ChunkBudget(chunk_rows, max_memory_bytes)
+    for rows in _split_chunks(row_batches, chunk_rows):
+        ds = DataSet(rows, schema=schema, orient=orient, executor=executor, **kwargs)
+        chunk_rows.update(ds)
+        yield ds
+
+
+def read_text_chunks(
+    filepath_or_buffer,
+    chunk_rows=100000,
+    sep="\t",
+    schema=None,
+    newline="\n",
+    skip_blank_lines=True,
+    skip_begin_lines=0,
+    skip_end_lines=0,
+    encoding="utf-8",
+    workers=None,
+    executor=None,
+    max_memory_bytes=None,
+    **kwargs
+):
+    """
+    Reads the text by pieces and returns it by chunks of DataSet,
+    so the whole text is never loaded into memory.
+
+    :param filepath_or_buffer: str, path to the file or file object
+        in text or binary mode
+    :param chunk_rows: int, max number of rows in one DataSet
+    :param max_memory_bytes: int, approximate max memory of one converted DataSet,
+        the number of rows is estimated by the previous chunk,
+        starting with MEMORY_PROBE_ROWS
+    :param encoding: str, used for paths and binary file objects
+    :param workers: int, converts columns in a pool of so many processes,
+        the pool is shared by all chunks
+    :param executor: concurrent.futures.Executor, converts columns in it
+    :param kwargs: series params passed to each DataSet
+    :return: generator of DataSet
+    """
+
+    def iter_row_batches(f):
+        parser = _TextParser(
+            sep=sep,
+            newline=newline,
+            skip_blank_lines=skip_blank_lines,
+            skip_begin_lines=skip_begin_lines,
+            skip_end_lines=skip_end_lines,
+        )
+        for text in iter(partial(f.read, READ_BLOCK_SIZE), ""):
+            yield parser.feed(text)
+        yield parser.close()
+
+    with _open_text(filepath_or_buffer, encoding=encoding) as f:
+        yield from _iter_dataset_chunks(
+            iter_row_batches(f),
+            orient="values",
+            schema=schema,
+            chunk_rows=chunk_rows,
+            max_memory_bytes=max_memory_bytes,
+            workers=workers,
+            executor=executor,
+            **kwargs
+        )
+
+
+def read_jsonl(
+    filepath_or_buffer,
+    schema=None,
+    chunk_rows=100000,
+    encoding="utf-8",
+    workers=None,
+    executor=None,
+    max_memory_bytes=None,
+    **kwargs
+):
+    """
+    Reads JSON Lines, one object per line, and returns them by chunks of DataSet.
+    Lines are parsed as they are read, so all records are never in memory at once.
+    Without a schema, each chunk has the columns found in its records.
+
+    :param filepath_or_buffer: str, path to the file or file object
+        in text or binary mode
+    :param schema: list of dict, Schema, must contain the column names
+    :param chunk_rows: int, max number of rows in one DataSet
+    :param encoding: str, used for paths and binary file objects
+    :param workers: int, converts columns in a pool of so many processes,
+        the pool is shared by all chunks
+    :param executor: concurrent.futures.Executor, converts columns in it
+    :param max_memory_bytes: int, approximate max memory of one converted DataSet,
+        like in read_text_chunks
+    :param kwargs: series params passed to each DataSet
+    :return: generator of DataSet
+    """
+    loads = _import_module("json").loads
+
+    def iter_row_batches(f):
+        for line in f:
+            if line.strip():
+                yield [loads(line)]
+
+    with _open_text(filepath_or_buffer, encoding=encoding) as f:
+        yield from _iter_dataset_chunks(
+            iter_row_batches(f),
+            orient="dict",
+            schema=schema,
+            chunk_rows=chunk_rows,
+            max_memory_bytes=max_memory_bytes,
+            workers=workers,
+            executor=executor,
+            **kwargs
+        )
+
+
+@lru_cache(maxsize=None)
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class _ArrayMixin:
+    """Methods shared by the compact storages of Series values."""
+
+    iter_block_size = 65536
+
+    def _numpy_flags(self, flags):
+        """Returns flags as a numpy bool array of the length of the array."""
+        np = self._np
+        if isinstance(flags, np.ndarray):
+            flags = flags.astype(bool)
+        else:
+            flags = np.fromiter(map(bool, flags), dtype=bool)
+        # Like zip, the shortest sequence determines the length.
+        flags.resize(len(self), refcheck=False)
+        return flags
+
+    def __iter__(self):
+        for start in range(0, len(self), self.iter_block_size):
+            yield from self[start : start + self.iter_block_size].tolist()
+
+
+class _TypedArray(_ArrayMixin):
+    """
+    Compact storage of numbers: array.array (numpy.ndarray, if numpy is installed)
+    and a separate mask of nulls. Returns the same values as the list it was made of.
+    """
+
+    typecodes = {"int": "q", "uint": "Q", "float": "d", "timestamp": "d", "bool": "b"}
+    pytypes = {"q": int, "Q": int, "d": float, "b": bool}
+    numpy_dtypes = {"q": "int64", "Q": "uint64", "d": "float64", "b": "bool"}
+
+    def __init__(self, values, mask, typecode, null_value=None):
+        """
+        :param values: array.array, numpy.ndarray
+        :param mask: bytearray, numpy.ndarray, None, true values mark nulls
+        :param typecode: str, array.array typecode
+        """
+        self.values = values
+        self.mask = mask
+        self.typecode = typecode
+        self.null_value = null_value
+        self._np = None if isinstance(values, array.array) else _import_numpy()
+
+    @classmethod
+    def from_numpy(cls, values, null_value=None):
+        typecode = {"b": "b", "i": "q", "u": "Q", "f": "d"}[values.dtype.kind]
+        values = values.astype(cls.numpy_dtypes[typecode], copy=False)
+        return cls(values, None, typecode, null_value)
+
+    @classmethod
+    def from_list(cls, data, dtype=None, null_value=None):
+        """Returns None, if the values can not be packed without changing them."""
+        if dtype is None:
+            for value in data:
+                if value is not None and value is not null_value:
+                    dtype = {int: "int", float: "float", bool: "bool"}.get(type(value))
+                    break
+        typecode = cls.typecodes.get(dtype)
+        if typecode is None:
+            return None
+
+        pytype = cls.pytypes[typecode]
+        null_type = type(null_value)
+        values = array.array(typecode)
+        append = values.append
+        mask = None
+        try:
+            for value in data:
+                if type(value) is pytype:
+                    append(value)
+                    if mask is not None:
+                        mask.append(0)
+                elif value is null_value or (
+                    type(value) is null_type and value == null_value
+                ):
+                    if mask is None:
+                        mask = bytearray(len(values))
+                    append(0)
+                    mask.append(1)
+                else:
+                    return None
+        except OverflowError:
+            return None
+
+        np = _import_numpy()
+        if np is not None:
+            values = np.frombuffer(values, dtype=cls.numpy_dtypes[typecode])
+            if mask is not None:
+                mask = np.frombuffer(mask, dtype=bool)
+
+        return cls(values, mask, typecode, null_value)
+
+    def _pytype(self):
+        return self.pytypes[self.typecode]
+
+    def _is_null_value(self, value):
+        return value is self.null_value or (
+            type(value) is type(self.null_value) and value == self.null_value
+        )
+
+    def _null_positions(self):
+        if self.mask is None:
+            return []
+        elif self._np is not None:
+            return self._np.flatnonzero(self.mask).tolist()
+        positions = []
+        index = self.mask.find(1)
+        while index != -1:
+            positions.append(index)
+            index = self.mask.find(1, index + 1)
+        return positions
+
+    def _new(self, values, mask):
+        return _TypedArray(values, mask, self.typecode, self.null_value)
+
+    @property
+    def nbytes(self):
+        if self._np is not None:
+            return self.values.nbytes + (0 if self.mask is None else self.mask.nbytes)
+        return sys.getsizeof(self.values) + (
+            0 if self.mask is None else sys.getsizeof(self.mask)
+        )
+
+    def tolist(self):
+        data = self.values.tolist()
+        if self.typecode == "b" and self._np is None:
+            data = list(map(bool, data))
+        for index in self._null_positions():
+            data[index] = self.null_value
+        return data
+
+    def compress(self, flags):
+        """Leaves the values for which flags are true."""
+        if self._np is not None:
+            flags = self._numpy_flags(flags)
+            return self._new(
+                self.values[flags], None if self.mask is None else self.mask[flags]
+            )
+        flags = list(flags)
+        return self._new(
+            array.array(self.typecode, compress(self.values, flags)),
+            None if self.mask is None else bytearray(compress(self.mask, flags)),
+        )
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            values = self.values[key]
+            mask = None if self.mask is None else self.mask[key]
+            if self._np is not None:
+                # Numpy slices share memory with the array, unlike lists.
+                values = values.copy()
+                mask = None if mask is None else mask.copy()
+            return self._new(values, mask)
+
+        if self.mask is not None and self.mask[key]:
+            return self.null_value
+        return self._pytype()(self.values[key])
+
+    def __setitem__(self, key, value):
+        if type(value) is self._pytype():
+            self.values[key] = value
+            if self.mask is not None:
+                self.mask[key] = 0
+        elif self._is_null_value(value):
+            if self.mask is None:
+                if self._np is not None:
+                    self.mask = self._np.zeros(len(self), dtype=bool)
+                else:
+                    self.mask = bytearray(len(self))
+            self.mask[key] = 1
+        else:
+            raise TypeError("The value can not be stored in the typed array")
+
+    def __delitem__(self, key):
+        if self._np is not None:
+            self.values = self._np.delete(self.values, key)
+            if self.mask is not None:
+                self.mask = self._np.delete(self.mask, key)
+        else:
+            del self.values[key]
+            if self.mask is not None:
+                del self.mask[key]
+
+
+class _CategoricalArray(_ArrayMixin):
+    """
+    Dictionary encoded values: a list of unique values (categories)
+    and an integer code of the category for each value.
+    Functions are applied once per category instead of once per value.
+    """
+
+    def __init__(self, codes, categories):
+        """
+        :param codes: array.array, numpy.ndarray, positions in categories
+        :param categories: list, unique values
+        """
+        self.codes = codes
+        self.categories = categories
+        self._np = None if isinstance(codes, array.array) else _import_numpy()
+
+    @classmethod
+    def from_list(cls, data):
+        """Returns None, if the values can not be encoded without changing them."""
+        try:
+            categories = list(dict.fromkeys(data))
+        except TypeError:
+            return None
+        if any(type(value) not in (str, type(None)) for value in categories):
+            # Equal values of different types, like 1 and True, share a dict key.
+            return None
+
+        category_codes = {value: code for code, value in enumerate(categories)}
+        codes = array.array("i", map(category_codes.__getitem__, data))
+
+        np = _import_numpy()
+        if np is not None:
+            codes = np.frombuffer(codes, dtype="int32")
+        return cls(codes, categories)
+
+    def _new(self, codes):
+        return _CategoricalArray(codes, self.categories)
+
+    def decode(self, results):
+        """Returns a list of results of the categories for each code."""
+        return list(map(results.__getitem__, self.codes.tolist()))
+
+    def recode(self, results):
+        """
+        Returns results of the categories encoded for each code.
+        Returns None, if the results can not be encoded.
+        """
+        encoded = _CategoricalArray.from_list(results)
+        if encoded is None:
+            return None
+        if self._np is not None:
+            codes = encoded.codes[self.codes]
+        else:
+            codes = array.array("i", map(encoded.codes.__getitem__, self.codes))
+        return _CategoricalArray(codes, encoded.categories)
+
+    def used_categories(self):
+        if self._np is not None:
+            codes = self._np.unique(self.codes).tolist()
+        else:
+            codes = set(self.codes)
+        return [self.categories[code] for code in codes]
+
+    @property
+    def nbytes(self):
+        codes_size = (
+            self.codes.nbytes if self._np is not None else sys.getsizeof(self.codes)
+        )
+        return (
+            codes_size
+            + sys.getsizeof(self.categories)
+            + sum(map(sys.getsizeof, self.categories))
+        )
+
+    def tolist(self):
+        return self.decode(self.categories)
+
+    def compress(self, flags):
+        """Leaves the values for which flags are true."""
+        if self._np is not None:
+            return self._new(self.codes[self._numpy_flags(flags)])
+        return self._new(array.array("i", compress(self.codes, flags)))
+
+    def take(self, indices):
+        """Returns the values at the indices, the categories are kept."""
+        if self._np is not None:
+            indices = self._np.asarray(indices, dtype=self._np.intp)
+            return self._new(self.codes[indices])
+        return self._new(array.array("i", map(self.codes.__getitem__, indices)))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            codes = self.codes[key]
+            if self._np is not None:
+                # Numpy slices share memory with the array, unlike lists.
+                codes = codes.copy()
+            return self._new(codes)
+        return self.categories[self.codes[key]]
+
+    def __setitem__(self, key, value):
+        if type(value) not in (str, type(None)):
+            raise TypeError("The value can not be stored in the categorical array")
+        try:
+            code = self.categories.index(value)
+        except ValueError:
+            # Categories may be shared with other arrays, so they are not changed.
+            self.categories = self.categories + [value]
+            code = len(self.categories) - 1
+        self.codes[key] = code
+
+    def __delitem__(self, key):
+        if self._np is not None:
+            self.codes = self._np.delete(self.codes, key)
+        else:
+            del self.codes[key]
+
+
+def _flatten_arrays(rows, depth):
+    """
+    Returns the values of the last nesting level in one list
+    and offsets of the arrays of each level in the next level.
+    """
+    offsets_list = []
+    items = rows
+    for _ in range(depth):
+        flat = []
+        offsets = array.array("q", [0])
+        extend = flat.extend
+        append = offsets.append
+        for values in items:
+            if not isinstance(values, list):
+                values = deserialize_list(values)
+                if not isinstance(values, list):
+                    raise TypeError("Arrays of different nesting levels")
+            extend(values)
+            append(len(flat))
+        offsets_list.append(offsets)
+        items = flat
+    return items, offsets_list
+
+
+def _nest_arrays(values, offsets_list):
+    """Builds nested lists back from flat values and offsets."""
+    for offsets in reversed(offsets_list):
+        values = [values[start:stop] for start, stop in zip(offsets, offsets[1:])]
+    return values
+
+
+class _ListArray(_ArrayMixin):
+    """
+    Arrays of a nested column: values of the last nesting level stored flat
+    (packed into _TypedArray, if possible) and offsets of the arrays of each level,
+    like ListArray in Arrow. Nested lists are built on demand.
+    """
+
+    def __init__(self, values, offsets_list):
+        """
+        :param values: list, _TypedArray
+        :param offsets_list: list of array.array, offsets of each nesting level,
+            array i of the level is values of the next level
+            from offsets[i] to offsets[i + 1]
+        """
+        self.values = values
+        self.offsets_list = offsets_list
+
+    @classmethod
+    def from_flat(cls, values, offsets_list, dtype=None, null_value=None):
+        """
+        :param offsets_list: list of array.array
+        """
+        values = _TypedArray.from_list(values, dtype, null_value) or values
+        return cls(values, offsets_list)
+
+    @classmethod
+    def from_list(cls, data, depth, dtype=None, null_value=None):
+        """Returns None, if the values are not nested lists of the depth."""
+        offsets_list = []
+        items = data
+        for _ in range(depth):
+            flat = []
+            offsets = array.array("q", [0])
+            for values in items:
+                if not isinstance(values, list):
+                    return None
+                flat.extend(values)
+                offsets.append(len(flat))
+            offsets_list.append(offsets)
+            items = flat
+        return cls.from_flat(items, offsets_list, dtype, null_value)
+
+    @property
+    def depth(self):
+        return len(self.offsets_list)
+
+    def flat_values(self):
+        return self.values if isinstance(self.values, list) else self.values.tolist()
+
+    @property
+    def nbytes(self):
+        values_size = (
+            sys.getsizeof(self.values)
+            if isinstance(self.values, list)
+            else self.values.nbytes
+        )
+        return values_size + sum(map(sys.getsizeof, self.offsets_list))
+
+    def tolist(self):
+        return _nest_arrays(self.flat_values(), self.offsets_list)
+
+    def compress(self, flags):
+        return list(compress(self, flags))
+
+    def __len__(self):
+        return len(self.offsets_list[0]) - 1
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            index = range(len(self))[key]
+            return self[index : index + 1].tolist()[0]
+
+        start, stop, step = key.indices(len(self))
+        if step != 1:
+            return [self[index] for index in range(start, stop, step)]
+        stop = max(start, stop)
+
+        offsets_list = []
+        for offsets in self.offsets_list:
+            offsets = offsets[start : stop + 1]
+            start, stop = offsets[0], offsets[-1]
+            offsets_list.append(array.array("q", (i - start for i in offsets)))
+        return _ListArray(self.values[start:stop], offsets_list)
+
+    def __setitem__(self, key, value):
+        raise TypeError("The value can not be stored in the list array")
+
+
+class _SliceView:
+    """Values of another storage selected by a slice, without a copy."""
+
+    def __init__(self, base, rows):
+        """
+        :param base: list, _TypedArray
+        :param rows: range, positions of the values in base
+        """
+        self.base = base
+        self.rows = rows
+
+    @classmethod
+    def from_slice(cls, base, key):
+        if isinstance(base, _SliceView):
+            return cls(base.base, base.rows[key])
+        return cls(base, range(len(base))[key])
+
+    def _slice(self):
+        rows = self.rows
+        # Stop of a reversed range is -1, which means the end for a slice.
+        return slice(rows.start, None if rows.stop < 0 else rows.stop, rows.step)
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.rows)
+
+    def tolist(self):
+        data = self.base[self._slice()]
+        return data if isinstance(data, list) else data.tolist()
+
+    def compress(self, flags):
+        return list(compress(self, flags))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        if isinstance(self.base, list):
+            return map(self.base.__getitem__, self.rows)
+        return iter(self.tolist())
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return _SliceView(self.base, self.rows[key])
+        return self.base[self.rows[key]]
 
 
 class Gun:
@@ -142,6 +1098,9 @@ class Gun:
             return None
 
     def shot(self, func, obj, *args, **kwargs):
+        index = self._call_number
+        self._call_number += 1
+
         if not isinstance(obj, Iterable) and obj in self.clear_values:
             if self.default_value != dtype_default_value:
                 return self.default_value
@@ -156,18 +1115,235 @@ class Gun:
                     return self.default_value
 
         try:
-            result = func(obj, *args, **kwargs)
+            return func(obj, *args, **kwargs)
         except Exception as e:
-            self.error_values[self._call_number] = obj
+            self.error_values[index] = obj
             return self._process_error(obj, e)
-        else:
-            return result
-        finally:
-            self._call_number += 1
 
     def __call__(self, obj, *args, **kwargs):
         return self.shot(self.func, obj, *args, **kwargs)
 
+    def map(self, values):
+        """
+        Converts all values in one pass,
+        the result is the same as list(map(self, values)).
+        All settings are read once, and not for each value.
+        """
+        func = self.func
+        process_error = self._process_error
+        error_values = self.error_values
+        allow_null = self.allow_null
+        null_value = self.null_value
+        null_values = self.null_values
+        clear_values = self.clear_values
+        default_value = self.default_value
+        has_default_value = default_value != dtype_default_value
+        # Iterable values (strings, lists) are never compared
+        # with null and clear values.
+        iterable_types = {}
+
+        result = []
+        append = result.append
+        index = self._call_number
+        for obj in values:
+            is_iterable = iterable_types.get(type(obj))
+            if is_iterable is None:
+                is_iterable = iterable_types[type(obj)] = isinstance(obj, Iterable)
+
+            if not is_iterable:
+                if obj in clear_values:
+                    if has_default_value:
+                        append(default_value)
+                        index += 1
+                        continue
+                    obj = null_value
+                    is_iterable = isinstance(obj, Iterable)
+
+                if not is_iterable and obj in null_values:
+                    if allow_null:
+                        append(null_value)
+                        index += 1
+                        continue
+                    elif has_default_value:
+                        append(default_value)
+                        index += 1
+                        continue
+
+            try:
+                append(func(obj))
+            except Exception as e:
+                error_values[index] = obj
+                append(process_error(obj, e))
+            index += 1
+
+        self._call_number = index
+        return result
+
+
+_COMPARISON_OPERATORS = (
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.gt,
+    operator.le,
+    operator.ge,
+)
+
+
+def _numpy_operands(op, left, right, np):
+    """
+    Prepares the operands of an arithmetic or comparison operation for numpy.
+    Returns None, if the result of numpy may differ from the result over Python values:
+    integer overflow, loss of precision when converting to float, division by zero.
+    """
+    is_arithmetic = op not in _COMPARISON_OPERATORS
+    operands = []
+    int_bounds = []
+    has_float = False
+    for operand in (left, right):
+        if isinstance(operand, np.ndarray):
+            kind = operand.dtype.kind
+            if kind == "b" and is_arithmetic:
+                # In numpy True + True is True, in Python it is 2.
+                return None
+            if kind in "biu" and len(operand):
+                bound = max(abs(int(operand.min())), abs(int(operand.max())))
+            else:
+                bound = 0
+            if kind == "u":
+                if bound >= 2 ** 63:
+                    return None
+                operand = operand.astype("int64")
+            has_float = has_float or kind == "f"
+        else:
+            bound = abs(operand) if type(operand) is int else 0
+            has_float = has_float or type(operand) is float
+        operands.append(operand)
+        int_bounds.append(bound)
+
+    left_bound, right_bound = int_bounds
+    int_bound = max(int_bounds)
+    if int_bound >= 2 ** 63:
+        return None
+    elif has_float and int_bound > 2 ** 53:
+        return None
+    elif op in (operator.truediv, operator.floordiv, operator.mod):
+        if np.any(np.equal(operands[1], 0)):
+            # Python raises ZeroDivisionError.
+            return None
+        if op is operator.truediv and int_bound > 2 ** 53:
+            return None
+    elif op is operator.mul:
+        if left_bound * right_bound >= 2 ** 63:
+            return None
+    elif is_arithmetic and left_bound + right_bound >= 2 ** 63:
+        return None
+
+    return operands
+
+
+def _deep_sizeof(obj):
+    """Size of the object with the objects in lists, tuples, sets and dicts."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(map(_deep_sizeof, obj))
+    elif isinstance(obj, dict):
+        size += sum(map(_deep_sizeof, obj.keys()))
+        size += sum(map(_deep_sizeof, obj.values()))
+    return size
+
+
+def _storage_memory_usage(data, deep):
+    """Memory of the values of the series, boxed values are counted when deep."""
+    if isinstance(data, (list, str)):
+        return _deep_sizeof(data) if deep else sys.getsizeof(data)
+    size = data.nbytes
+    if not deep:
+        return size
+    if isinstance(data, _ListArray) and isinstance(data.values, list):
+        size += sum(map(_deep_sizeof, data.values))
+    elif isinstance(data, _SliceView):
+        # The part of the base storage selected by the view.
+        if isinstance(data.base, list):
+            size += sum(map(_deep_sizeof, data))
+        elif len(data.base):
+            base_size = _storage_memory_usage(data.base, deep)
+            size += base_size * len(data.rows) // len(data.base)
+    return size
+
+
+def _is_null(value):
+    """None and float NaN, which is not equal to itself and can not be ordered."""
+    return value is None or value != value
+
+
+def _sort_indices(indices, values, ascending=True, na_position="last"):
+    """
+    Stable sort of the indices by the values at them, null values are placed apart.
+    """
+    if na_position not in ("first", "last"):
+        raise ValueError("{} = неверный na_position".format(na_position))
+    nulls = [i for i in indices if _is_null(values[i])]
+    indices = sorted(
+        [i for i in indices if not _is_null(values[i])] if nulls else indices,
+        key=values.__getitem__,
+        reverse=not ascending,
+    )
+    return nulls + indices if na_position == "first" else indices + nulls
+
+
+def _contains_func(values):
+    """
+    Returns a function that checks if an object is in values.
+    Lists, tuples and iterators are turned into a set once,
+    their unhashable values are searched in a sorted list.
+    """
+    if not isinstance(values, (list, tuple, Iterator)):
+        # Strings check substrings, sets, dicts and ranges are fast already.
+        return lambda obj: obj in values
+
+    hashable = set()
+    unhashable = []
+    for value in values:
+        try:
+            hashable.add(value)
+        except TypeError:
+            unhashable.append(value)
+
+    try:
+        unhashable.sort()
+        is_sorted = True
+    except TypeError:
+        is_sorted = False
+
+    def contains(obj):
+        try:
+            return obj in hashable
+        except TypeError:
+            pass
+        if is_sorted:
+            try:
+                index = bisect.bisect_left(unhashable, obj)
+                return index < len(unhashable) and unhashable[index] == obj
+            except TypeError:
+                pass
+        return obj in unhashable
+
+    return contains
+
+
+def _convert_column(values, series_schema, stats=False):
+    """
+    Converts a column in a worker process.
+    Returns data, error values and stats, because Series with functions from the schema
+    can not be passed back to the main process.
+    """
+    if stats:
+        series = Series(values, stats_callback=_ignore_stats, **series_schema)
+    else:
+        series = Series(values, **series_schema)
+    return series.data(), series.error_values, series.stats
+
 
 class SeriesMagicMethodMixin:
     _schema = None
@@ -175,8 +1351,67 @@ class SeriesMagicMethodMixin:
     def data(self):
         return []
 
+    def _numpy_values(self):
+        """
+        Returns numpy.ndarray with the values, if they are stored in it without nulls.
+        """
+        return None
+
+    def _categorical(self):
+        return None
+
+    def _vectorize(self, op, obj=None):
+        """
+        Performs the operation over numpy arrays or once per category.
+        Returns None, if the values are not stored in numpy arrays or categories
+        or the result may differ from the result over Python values.
+        """
+        categorical = self._categorical()
+        if categorical is not None and not isinstance(obj, Series):
+            # The operation is performed once per category.
+            if op is operator.not_:
+                results = [op(category) for category in categorical.categories]
+            else:
+                results = [op(category, obj) for category in categorical.categories]
+            return Series(**self._schema, data=categorical.decode(results))
+
+        left = self._numpy_values()
+        if left is None:
+            return None
+        np = _import_numpy()
+
+        if op is operator.not_:
+            result = np.logical_not(left)
+        else:
+            if isinstance(obj, Series):
+                right = obj._numpy_values()
+                if right is None or len(right) != len(left):
+                    return None
+            elif type(obj) in (int, float) and op not in (operator.and_, operator.or_):
+                right = obj
+            else:
+                return None
+
+            if op is operator.and_:
+                result = np.logical_and(left, right)
+            elif op is operator.or_:
+                result = np.logical_or(left, right)
+            else:
+                operands = _numpy_operands(op, left, right, np)
+                if operands is None:
+                    return None
+                with np.errstate(all="ignore"):
+                    result = op(*operands)
+
+        return Series(
+            **self._schema, data=_TypedArray.from_numpy(result, self.null_value)
+        )
+
     def __add__(self, obj):
         "Сложение."
+        series = self._vectorize(operator.add, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 + val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -185,6 +1420,9 @@ class SeriesMagicMethodMixin:
 
     def __sub__(self, obj):
         "Вычитание."
+        series = self._vectorize(operator.sub, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 - val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -193,6 +1431,9 @@ class SeriesMagicMethodMixin:
 
     def __mul__(self, obj):
         "Умножение."
+        series = self._vectorize(operator.mul, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 * val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -201,6 +1442,9 @@ class SeriesMagicMethodMixin:
 
     def __floordiv__(self, obj):
         "Целочисленное деление, оператор //."
+        series = self._vectorize(operator.floordiv, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 // val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -209,6 +1453,9 @@ class SeriesMagicMethodMixin:
 
     def __truediv__(self, obj):
         "Деление, оператор /."
+        series = self._vectorize(operator.truediv, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 / val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -217,6 +1464,9 @@ class SeriesMagicMethodMixin:
 
     def __mod__(self, obj):
         "Остаток от деления, оператор %."
+        series = self._vectorize(operator.mod, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 % val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -234,7 +1484,10 @@ class SeriesMagicMethodMixin:
     def __and__(self, obj):
         "Двоичное И, оператор &."
         if isinstance(obj, Series):
-            data = [all([val1, val2]) for val1, val2 in zip(self.data(), obj.data())]
+            series = self._vectorize(operator.and_, obj)
+            if series is not None:
+                return series
+            data = [bool(val1 and val2) for val1, val2 in zip(self.data(), obj.data())]
         else:
             raise ValueError(ONLY_SERIES_ERROR)
         return Series(**self._schema, data=data)
@@ -242,18 +1495,27 @@ class SeriesMagicMethodMixin:
     def __or__(self, obj):
         "Двоичное ИЛИ, оператор |"
         if isinstance(obj, Series):
-            data = [any([val1, val2]) for val1, val2 in zip(self.data(), obj.data())]
+            series = self._vectorize(operator.or_, obj)
+            if series is not None:
+                return series
+            data = [bool(val1 or val2) for val1, val2 in zip(self.data(), obj.data())]
         else:
             raise ValueError(ONLY_SERIES_ERROR)
         return Series(**self._schema, data=data)
 
     def __invert__(self):
         "Определяет поведение для инвертирования оператором ~."
+        series = self._vectorize(operator.not_)
+        if series is not None:
+            return series
         data = [not value for value in self.data()]
         return Series(**self._schema, data=data)
 
     def __eq__(self, obj):
         """Определяет поведение оператора равенства, ==."""
+        series = self._vectorize(operator.eq, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 == val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -262,6 +1524,9 @@ class SeriesMagicMethodMixin:
 
     def __ne__(self, obj):
         """Определяет поведение оператора неравенства, !=."""
+        series = self._vectorize(operator.ne, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 != val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -270,6 +1535,9 @@ class SeriesMagicMethodMixin:
 
     def __lt__(self, obj):
         """Определяет поведение оператора меньше, <."""
+        series = self._vectorize(operator.lt, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 < val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -278,6 +1546,9 @@ class SeriesMagicMethodMixin:
 
     def __gt__(self, obj):
         """Определяет поведение оператора больше, >."""
+        series = self._vectorize(operator.gt, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 > val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -286,6 +1557,9 @@ class SeriesMagicMethodMixin:
 
     def __le__(self, obj):
         """Определяет поведение оператора меньше или равно, <=."""
+        series = self._vectorize(operator.le, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 <= val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -294,6 +1568,9 @@ class SeriesMagicMethodMixin:
 
     def __ge__(self, obj):
         """Определяет поведение оператора больше, >=."""
+        series = self._vectorize(operator.ge, obj)
+        if series is not None:
+            return series
         if isinstance(obj, Series):
             data = [val1 >= val2 for val1, val2 in zip(self.data(), obj.data())]
         else:
@@ -328,17 +1605,27 @@ class Series(SeriesMagicMethodMixin):
         transform_func=None,
         filter_func=None,
         clear_values=None,
+        storage="list",
+        lazy=False,
+        stats_callback=None,
         **kwargs
     ):
         """
 
         :param data: str, list
-        :param dtype: str
+        :param dtype: str, category = strings stored as integer codes of unique values
         :param default_value: any
         :param errors: str, coerce|raise|ignore|default
         :param is_array: bool
-        :param dt_format: None, str, timestamp|{datatime format}
+        :param dt_format: None, str, timestamp|infer|{datatime format}
         :param depth: int
+        :param storage: str, list|array
+            - list = values are stored in a list
+            - array = numbers are packed into array.array (numpy.ndarray, if installed)
+              with a separate mask of nulls, other values are stored in a list
+        :param lazy: bool, data is converted on first access, not in the constructor
+        :param stats_callback: callable, gets ConversionStats of the conversion,
+            they are kept in Series.stats too
         """
         if dtype not in (
             None,
@@ -350,11 +1637,22 @@ class Series(SeriesMagicMethodMixin):
             "date",
             "datetime",
             "timestamp",
+            "category",
         ):
             raise ValueError("{} = неверный dtype".format(dtype))
         if errors not in ("coerce", "raise", "ignore", "default"):
             raise ValueError("{} = неверный errors".format(errors))
-
+        if storage not in ("list", "array"):
+            raise ValueError("{} = неверный storage".format(storage))
+
+        # Data waiting for the conversion in lazy mode.
+        self._raw_data = None
+        self._stats_callback = stats_callback
+        self.stats = None
+        # Error values of the series this one is a slice of, and positions of the slice.
+        self._error_values_source = None
+        # Slices share the storage with this series, so it is copied before a change.
+        self._shared = False
         # rename null_value to null_default_value
         self.null_value = null_value
         self.allow_null = allow_null or (
@@ -370,7 +1668,8 @@ class Series(SeriesMagicMethodMixin):
         self._timezone = timezone
         self._data = data
         self._clear_values = clear_values
-        self.error_values = kwargs.pop("error_values", {})  # TODO: wrap property
+        self._storage = storage
+        self.error_values = kwargs.pop("error_values", {})
 
         if transform_func is None:
             self._transform_func = None
@@ -394,6 +1693,42 @@ class Series(SeriesMagicMethodMixin):
         else:
             self._filter_func = [filter_func]
 
+        if lazy and data is not None:
+            self._raw_data = data
+        else:
+            self._deserialize(data)
+
+    @property
+    def _data(self):
+        if self._raw_data is not None:
+            self._deserialize_raw_data()
+        return self._values
+
+    @_data.setter
+    def _data(self, value):
+        self._values = value
+
+    @property
+    def error_values(self):
+        if self._raw_data is not None:
+            self._deserialize_raw_data()
+        if self._error_values_source is not None:
+            error_values, rows = self._error_values_source
+            self._error_values_source = None
+            self._error_values = {
+                rows.index(index): value
+                for index, value in error_values.items()
+                if index in rows
+            }
+        return self._error_values
+
+    @error_values.setter
+    def error_values(self, value):
+        self._error_values_source = None
+        self._error_values = value
+
+    def _deserialize_raw_data(self):
+        data, self._raw_data = self._raw_data, None
         self._deserialize(data)
 
     @staticmethod
@@ -414,18 +1749,50 @@ class Series(SeriesMagicMethodMixin):
             "null_value": self.null_value,
             "null_values": self.null_values,
             "name": self.name,
+            "storage": self._storage,
         }
 
     def get_schema(self, **kwargs):
         return {**self._schema, **kwargs}
 
     def _deserialize(self, data):
+        if self._stats_callback is None or not isinstance(data, list):
+            self._convert(data)
+            return
+
+        start = time.perf_counter()
+        cache_hits, cache_misses = _datetime_cache_info()
+        self._convert(data)
+        seconds = time.perf_counter() - start
+        end_cache_hits, end_cache_misses = _datetime_cache_info()
+
+        if isinstance(self._data, list):
+            nulls = self._data.count(None)
+        else:
+            nulls = sum(1 for value in self._data if value is None)
+        self.stats = ConversionStats(
+            stage="series",
+            name=self.name,
+            dtype=self._dtype,
+            rows=len(data),
+            seconds=seconds,
+            nulls=nulls,
+            errors=len(self._error_values),
+            cache_hits=end_cache_hits - cache_hits,
+            cache_misses=end_cache_misses - cache_misses,
+        )
+        self._stats_callback(self.stats)
+
+    def _convert(self, data):
         if data is None:
             return
         elif isinstance(data, Series):
             self._data = data.data()
             self.error_values = data.error_values
             return
+        elif isinstance(data, (_TypedArray, _CategoricalArray, _ListArray, _SliceView)):
+            self._data = data
+            return
         elif not isinstance(data, list):
             raise TypeError("Data parameter must be an list")
         elif not data:
@@ -443,7 +1810,7 @@ class Series(SeriesMagicMethodMixin):
                     depth=self.depth,
                     default_value=self._default_value,
                 )
-            self._data = series.data()
+            self._data = series._data
             self.error_values = series.error_values
         else:
             self._data = data
@@ -461,6 +1828,24 @@ class Series(SeriesMagicMethodMixin):
             for func in self._transform_func:
                 self._data = self.filter(self.applymap(func)).data()
 
+        self._pack()
+
+    def _pack(self):
+        if self._dtype == "category" and isinstance(self._data, list):
+            self._data = _CategoricalArray.from_list(self._data) or self._data
+        if self._storage == "array" and isinstance(self._data, list) and self.depth:
+            self._data = (
+                _ListArray.from_list(
+                    self._data, self.depth, self._dtype, self.null_value
+                )
+                or self._data
+            )
+        elif self._storage == "array" and isinstance(self._data, list):
+            self._data = (
+                _TypedArray.from_list(self._data, self._dtype, self.null_value)
+                or self._data
+            )
+
     def applymap(
         self, func, errors=None, default_value=dtype_default_value, depth=None
     ):
@@ -483,35 +1868,26 @@ class Series(SeriesMagicMethodMixin):
                     clear_values=self._clear_values,
                 )
             )
-            data = list(map(func_with_wrap, self._data[:]))
-            error_values = {**func_with_wrap.error_values, **self.error_values}
+            categorical = self._categorical()
+            if categorical is None:
+                data = func_with_wrap.map(self._data)
+                error_values = {**func_with_wrap.error_values, **self.error_values}
+            else:
+                data, error_values = self._applymap_categories(
+                    func_with_wrap, categorical
+                )
         else:
-            error_values = {}
-            data = self._data[:]
-            for i, array in enumerate(self):
-                if not isinstance(array, list):
-                    array = deserialize_list(array)
-
-                try:
-                    series = Series(
-                        **self.get_schema(
-                            data=array,
-                            dtype=None,
-                            default_value=default_value,
-                            errors=errors,
-                            depth=depth - 1,
-                            error_values=self.error_values,
-                            clear_values=self._clear_values,
-                        )
+            data, error_values = self._applymap_arrays(
+                Gun(
+                    **self.get_schema(
+                        func=func,
+                        errors=errors,
+                        default_value=default_value,
+                        clear_values=self._clear_values,
                     )
-                    series = series.applymap(func)
-                except TypeError as ex:
-                    if ex.args == ("Data parameter must be an list",):
-                        raise TypeError("Arrays of different nesting levels")
-                    raise
-                data[i] = series.data()
-                if series.error_values:
-                    error_values[i] = array
+                ),
+                depth,
+            )
 
         return Series(
             **self.get_schema(
@@ -519,21 +1895,91 @@ class Series(SeriesMagicMethodMixin):
             )
         )
 
+    def _applymap_arrays(self, gun, depth):
+        """
+        Converts the values of all arrays in one pass over their flat list,
+        arrays with errors are the error values of their rows.
+        """
+        if isinstance(self._data, _ListArray) and self._data.depth == depth:
+            values = self._data.flat_values()
+            offsets_list = self._data.offsets_list
+        else:
+            values, offsets_list = _flatten_arrays(self._data, depth)
+
+        if self._clear_values:
+            contains = _contains_func(self._clear_values)
+            null_value = self.null_value
+            values = [
+                null_value if not isinstance(value, list) and contains(value) else value
+                for value in values
+            ]
+        values = gun.map(values)
+
+        error_values = {}
+        for index in gun.error_values:
+            for offsets in reversed(offsets_list):
+                index = bisect.bisect_right(offsets, index) - 1
+            if index not in error_values:
+                array_ = self._data[index]
+                if not isinstance(array_, list):
+                    array_ = deserialize_list(array_)
+                error_values[index] = array_
+
+        if self._storage == "array":
+            data = _ListArray.from_flat(
+                values, offsets_list, null_value=self.null_value
+            )
+        else:
+            data = _nest_arrays(values, offsets_list)
+        return data, {**error_values, **self.error_values}
+
+    def _categorical(self):
+        """Returns _CategoricalArray with the values, if they are stored in it."""
+        data = self._data
+        if isinstance(data, _SliceView) and isinstance(data.base, _CategoricalArray):
+            return data.base[data._slice()]
+        elif isinstance(data, _CategoricalArray):
+            return data
+        return None
+
+    def _applymap_categories(self, gun, categorical):
+        """Converts each category once, the values get the result of their category."""
+        results = gun.map(categorical.categories)
+        data = categorical.recode(results) or categorical.decode(results)
+        error_values = {}
+        if gun.error_values:
+            for index, code in enumerate(categorical.codes.tolist()):
+                if code in gun.error_values:
+                    error_values[index] = gun.error_values[code]
+        return data, {**error_values, **self.error_values}
+
     def apply(self, func, errors=None, default_value=None):
         return self.applymap(
             func=func, errors=errors, default_value=default_value, depth=0
         )
 
     def to_string(self, errors=None, default_value="", **kwargs):
-        to_str_func = lambda obj: str(obj)
         return self.applymap(
-            func=to_str_func, errors=errors, default_value=default_value, **kwargs
+            func=str, errors=errors, default_value=default_value, **kwargs
         )
 
+    def to_category(self, errors=None, default_value="", **kwargs):
+        series = self
+        if isinstance(self._data, list) and not kwargs.get("depth", self.depth):
+            encoded = _CategoricalArray.from_list(self._data)
+            if encoded is not None:
+                # Strings are converted once per unique value.
+                series = Series(
+                    **self.get_schema(data=encoded, error_values=self.error_values)
+                )
+        series = series.to_string(errors=errors, default_value=default_value, **kwargs)
+        if isinstance(series._data, list):
+            series._data = _CategoricalArray.from_list(series._data) or series._data
+        return series
+
     def to_int(self, errors=None, default_value=0, **kwargs):
-        to_int_func = lambda obj: int(obj)
         return self.applymap(
-            func=to_int_func, errors=errors, default_value=default_value, **kwargs
+            func=int, errors=errors, default_value=default_value, **kwargs
         )
 
     def to_uint(self, errors=None, default_value=0, **kwargs):
@@ -548,9 +1994,8 @@ class Series(SeriesMagicMethodMixin):
         )
 
     def to_float(self, errors=None, default_value=0.0, **kwargs):
-        to_float_func = lambda obj: float(obj)
         return self.applymap(
-            func=to_float_func, errors=errors, default_value=default_value, **kwargs
+            func=float, errors=errors, default_value=default_value, **kwargs
         )
 
     def to_array(self, errors=None, default_value=list, **kwargs):
@@ -579,6 +2024,8 @@ class Series(SeriesMagicMethodMixin):
         :param dt_format: str, None
             - "timestamp" = converts a number or number in a string to a date and time
             - format = format for datetime.strptime function
+            - "infer" = guesses the format by a sample of values,
+              values that do not match the format are parsed by dateutil
             - None = parse
         :param errors: str, None
         :param default_value: dt.datetime
@@ -587,10 +2034,31 @@ class Series(SeriesMagicMethodMixin):
         """
         self._dt_format = dt_format or self._dt_format
         self._timezone = timezone or self._timezone
+        if isinstance(self._timezone, str):
+            self._timezone = _import_module("pytz").timezone(self._timezone)
 
         if default_value == dt.datetime:
             default_value = dt.datetime(1970, 1, 1, 0, 0, 0)
 
+        dt_format = self._dt_format
+        if dt_format == "timestamp":
+            parse_text = lambda obj: dt.datetime.fromtimestamp(int(obj))
+        elif dt_format == "infer":
+            # Nested arrays are not sampled, their values are parsed by dateutil.
+            if self.depth == 0:
+                skip_values = list(self.null_values) + list(self._clear_values or [])
+                dt_format = _infer_datetime_format(self._data, skip_values)
+            else:
+                dt_format = None
+            if dt_format:
+                parse_text = partial(_parse_datetime_as, dt_format=dt_format)
+            else:
+                parse_text = _parse_datetime
+        elif dt_format:
+            parse_text = partial(_strptime, dt_format=dt_format)
+        else:
+            parse_text = _parse_datetime
+
         def to_datetime_func(obj):
             if isinstance(obj, dt.datetime):
                 datetime = obj
@@ -599,20 +2067,9 @@ class Series(SeriesMagicMethodMixin):
             elif isinstance(obj, (int, float)):
                 datetime = dt.datetime.fromtimestamp(obj)
             else:
-                if dt_format == "timestamp":
-                    x = int(obj)
-                    datetime = dt.datetime.fromtimestamp(x)
-
-                elif dt_format:
-                    datetime = dt.datetime.strptime(obj, dt_format)
-
-                else:
-                    datetime = dt_parser.parse(obj)
+                datetime = parse_text(obj)
 
             if self._timezone:
-                if not isinstance(self._timezone, pytz.tzinfo.BaseTzInfo):
-                    self._timezone = pytz.timezone(self._timezone)
-
                 datetime = datetime.replace(tzinfo=self._timezone)
 
             return datetime
@@ -653,7 +2110,8 @@ class Series(SeriesMagicMethodMixin):
         return self.applymap(func=replace_func, **kwargs)
 
     def replace_values(self, old_values, new_value, **kwargs):
-        replace_func = lambda obj: new_value if obj in old_values else obj
+        contains = _contains_func(old_values)
+        replace_func = lambda obj: new_value if contains(obj) else obj
         return self.applymap(func=replace_func, **kwargs)
 
     def has(self, value, **kwargs):
@@ -661,30 +2119,90 @@ class Series(SeriesMagicMethodMixin):
         return self.applymap(func=has_func, **kwargs)
 
     def isin(self, value, **kwargs):
-        has_func = lambda obj: obj in value
-        return self.applymap(func=has_func, **kwargs)
+        return self.applymap(func=_contains_func(value), **kwargs)
 
     def filter(self, series):
-        return Series(
-            **series.get_schema(
-                data=[i for i, f in zip(self.data(), series.data()) if f],
-                error_values=series.error_values,
-            )
-        )
+        if isinstance(self._data, list):
+            data = [i for i, f in zip(self._data, series.data()) if f]
+        else:
+            flags = series._numpy_values()
+            data = self._data.compress(series.data() if flags is None else flags)
+        return Series(**series.get_schema(data=data, error_values=series.error_values))
+
+    def take(self, indices):
+        """
+        Returns a series of values at the indices, in their order.
+
+        :param indices: list of int
+        """
+        categorical = self._categorical()
+        if categorical is not None:
+            data = categorical.take(indices)
+        else:
+            values = self._data
+            data = [values[index] for index in indices]
+        error_values = {}
+        source_error_values = self.error_values
+        if source_error_values:
+            length = len(self)
+            for new_index, index in enumerate(indices):
+                if index < 0:
+                    index += length
+                if index in source_error_values:
+                    error_values[new_index] = source_error_values[index]
+        # The values are already converted, so they are not passed to the constructor.
+        series = Series(**self.get_schema(data=None, error_values=error_values))
+        series._data = data
+        series._pack()
+        return series
+
+    def argsort(self, ascending=True, na_position="last"):
+        """
+        Returns the indices that sort the series, the sort is stable.
+
+        :param na_position: str, first|last, where null values are placed
+        :return: list of int
+        """
+        return _sort_indices(range(len(self)), self.data(), ascending, na_position)
+
+    def sort_values(self, ascending=True, na_position="last"):
+        return self.take(self.argsort(ascending, na_position))
 
     def error_count(self):
         return len(self.error_values)
 
+    def error_index(self):
+        """Returns the sorted indices of values that had conversion errors."""
+        # Gun fills error_values in row order, so sorting is usually a linear pass.
+        return sorted(self.error_values)
+
     def null_count(self):
         return len(self.filter(self == None))
 
     @property
     def size(self):
-        return sys.getsizeof(self.data())
+        if isinstance(self._data, list):
+            return sys.getsizeof(self._data)
+        return self._data.nbytes
+
+    def memory_usage(self, deep=False):
+        """
+        Returns the memory of the values in bytes. Lazy data is not converted for it.
+
+        :param deep: bool, count the boxed values, strings, nested arrays
+            and error_values, otherwise only the storage itself
+        """
+        if self._raw_data is not None:
+            size = _storage_memory_usage(self._raw_data, deep)
+        else:
+            size = _storage_memory_usage(self._values, deep)
+        if deep:
+            size += _deep_sizeof(self._error_values)
+        return size
 
     def append(self, series_):
         if isinstance(series_, Series):
-            data = self._data + series_._data
+            data = self.data() + series_.data()
 
             error_values = {**self.error_values}
             last_index = len(self)
@@ -696,29 +2214,76 @@ class Series(SeriesMagicMethodMixin):
         else:
             raise TypeError(ONLY_SERIES_ERROR)
 
+    def _numpy_values(self):
+        data = self._data
+        key = slice(None)
+        if isinstance(data, _SliceView):
+            data, key = data.base, data._slice()
+        if isinstance(data, _TypedArray) and data._np is not None and data.mask is None:
+            return data.values[key]
+        return None
+
     def data(self):
-        return self._data
+        if isinstance(self._data, list):
+            return self._data
+        return self._data.tolist()
 
     def get_uniq_values(self):
+        categorical = self._categorical()
+        if categorical is not None:
+            return sorted(categorical.used_categories())
         return sorted(list(set(self._data)))
 
     def clone(self, **kwargs):
-        return Series(data=self.data()[:], **self.get_schema(**kwargs))
+        if isinstance(self._data, (list, _CategoricalArray)):
+            data = self._data[:]
+        else:
+            data = self.data()
+        return Series(
+            data=data,
+            **self.get_schema(**{"error_values": dict(self.error_values), **kwargs})
+        )
 
     def __len__(self):
+        if self._raw_data is not None and self._filter_func is None:
+            # The conversion does not change the number of values.
+            return len(self._raw_data)
         return len(self._data)
 
     def __getitem__(self, key):
-        data = self._data[key]
         if isinstance(key, slice):
-            return Series(**self.get_schema(data=data, error_values=self.error_values))
+            view = _SliceView.from_slice(self._data, key)
+            self._shared = True
+            series = Series(**self.get_schema(data=view))
+            # Keys of error_values are positions in self, not in the root storage.
+            rows = range(len(self))[key]
+            series._error_values_source = (self.error_values, rows)
+            return series
         else:
-            return data
+            return self._data[key]
+
+    def _unshare(self):
+        """Copies the storage shared with slices, before changing it."""
+        if isinstance(self._data, _SliceView):
+            self._data = self._data.tolist()
+        elif self._shared:
+            self._data = self._data[:]
+        self._shared = False
 
     def __setitem__(self, key, value):
+        self._unshare()
+        if not isinstance(self._data, list):
+            try:
+                self._data[key] = value
+                return
+            except (TypeError, OverflowError):
+                self._data = self._data.tolist()
         self._data[key] = value
 
     def __delitem__(self, key):
+        self._unshare()
+        if isinstance(self._data, _ListArray):
+            self._data = self._data.tolist()
         del self._data[key]
 
     def __str__(self):
@@ -748,9 +2313,92 @@ class Series(SeriesMagicMethodMixin):
         return self.data()
 
 
+class Schema:
+    """
+    Params of series prepared once: column names, defaults
+    and functions evaluated from strings. Can be passed to DataSet,
+    read_text and read_text_chunks many times, it is not changed by them.
+    """
+
+    def __init__(self, columns, **kwargs):
+        """
+        :param columns: list of dict, params of Series
+        :param kwargs: series params for all columns, like in DataSet
+        """
+        if isinstance(columns, Schema):
+            has_names = columns.has_names
+            columns = columns.raw_columns
+        else:
+            has_names = all("name" in column for column in columns)
+        defaults = {
+            param: kwargs[param] for param in SERIES_PARAMS.intersection(kwargs)
+        }
+
+        # All names are given, not filled by the positions of the columns.
+        self.has_names = has_names
+        self.raw_columns = []
+        self.columns = []
+        for col_index, column in enumerate(columns):
+            column = {**defaults, **column}
+            column["name"] = str(column.get("name", col_index))
+            column["dtype"] = column.get("dtype", None)
+            self.raw_columns.append(column)
+
+            column = dict(column)
+            for param in ("transform_func", "filter_func"):
+                funcs = column.get(param)
+                if funcs is not None:
+                    funcs = funcs if isinstance(funcs, list) else [funcs]
+                    column[param] = [
+                        eval(f) if isinstance(f, str) else f for f in funcs
+                    ]
+            # Checks the params.
+            Series(**column)
+            self.columns.append(column)
+
+    def with_defaults(self, **kwargs):
+        """
+        Returns a schema with series params for the columns where they are not set.
+        """
+        schema = Schema([])
+        schema.has_names = self.has_names
+        schema.raw_columns = [{**kwargs, **i} for i in self.raw_columns]
+        schema.columns = [{**kwargs, **i} for i in self.columns]
+        return schema
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __iter__(self):
+        return iter(self.columns)
+
+
 class DataSet:
-    def __init__(self, data=None, schema=None, orient="values", **kwargs):
+    def __init__(
+        self,
+        data=None,
+        schema=None,
+        orient="values",
+        workers=None,
+        executor=None,
+        stats_callback=None,
+        **kwargs
+    ):
+        """
+        :param schema: list of dict, Schema
+        :param workers: int, converts columns in a pool of so many processes
+        :param executor: concurrent.futures.Executor, converts columns in it.
+            Functions in the schema must be strings or module level functions,
+            so that they can be passed to another process.
+        :param lazy: bool, each column is converted on first access,
+            workers and executor are not used then
+        :param stats_callback: callable, gets ConversionStats of each series,
+            of splitting rows into columns and of the whole conversion.
+            It is called in this process, even if the columns are converted in workers.
+        """
         self.error_rows = []
+        self._stats_callback = stats_callback
+        self._lazy = kwargs.get("lazy", False)
 
         if data is None and schema:
             data = [[] for i in range(len(schema))]
@@ -770,23 +2418,19 @@ class DataSet:
                     self._schema = [{} for i in range(len(data))]
                 elif orient == "values":
                     self._schema = [{} for i in range(len(data[0]))]
-        # Set params in all series schema.
-        series_params = {
-            "errors",
-            "depth",
-            "allow_null",
-            "null_value",
-            "null_values",
-            "clear_values",
-            "timezone",
+        # Params set in all series schema.
+        self._series_defaults = {
+            param: kwargs[param] for param in SERIES_PARAMS.intersection(kwargs)
         }
-        default_series_params = set(kwargs.keys()).intersection(series_params)
-        for s in self._schema:
-            for param in default_series_params:
-                s[param] = s.pop(param, kwargs[param])
 
         self._series = []
-        self._deserialize(data, orient)
+        if workers and executor is None and not self._lazy:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self._deserialize(data, orient, executor)
+        else:
+            self._deserialize(data, orient, executor)
 
     @property
     def schema(self):
@@ -798,44 +2442,45 @@ class DataSet:
 
     def _get_error_index_rows(self):
         """Returns a list of indices of strings that had conversion errors."""
-        index_error_rows = set()
-        for series in self:
-            index_error_rows.update(set(series.error_values.keys()))
-        return sorted(list(index_error_rows))
+        index_error_rows = []
+        for index in heapq.merge(*[series.error_index() for series in self]):
+            if not index_error_rows or index_error_rows[-1] != index:
+                index_error_rows.append(index)
+        return index_error_rows
 
     def _dict_orient_data_to_columns(self, data):
         if self._schema:
             try:
+                if isinstance(self._schema, Schema) and not self._schema.has_names:
+                    raise KeyError("name")
                 column_names = [i["name"] for i in self._schema]
             except KeyError:
                 raise KeyError(
                     "If the data is in the dict and there is a schema, "
                     "then the schema must contain the column names."
                 )
-            data_orient_column = [[] for i in range(len(column_names))]
-            for row in data:
-                for col_index, col_name in enumerate(column_names):
-                    data_orient_column[col_index].append(row.get(col_name, None))
+            data_orient_column = [
+                [row.get(col_name, None) for row in data] for col_name in column_names
+            ]
         else:
-            data_orient_column = []
-            column_names = []
+            # Columns by names, in the order of their appearance.
+            columns = {}
             for row_index, row in enumerate(data):
                 for col_name, col_value in row.items():
-                    # The appearance of a new column.
-                    if col_name not in column_names:
-                        # Adding a new column name.
-                        column_names.append(col_name)
-                        # Adding blank data to previous lines.
-                        data_orient_column.append(
-                            [None for i in range(row_index)] or []
-                        )
-                    col_index = column_names.index(col_name)
-                    data_orient_column[col_index].append(col_value)
-                # Adding empty values to columns that are missing in a row.
-                for col_index, col_name in enumerate(column_names):
-                    if col_name not in row.keys():
-                        data_orient_column[col_index].append(None)
-
+                    column = columns.get(col_name)
+                    if column is None:
+                        # The appearance of a new column,
+                        # with blank data in previous lines.
+                        column = columns[col_name] = [None] * row_index
+                    elif len(column) < row_index:
+                        # The column was missing in the previous lines.
+                        column.extend([None] * (row_index - len(column)))
+                    column.append(col_value)
+            for column in columns.values():
+                column.extend([None] * (len(data) - len(column)))
+
+            column_names = list(columns)
+            data_orient_column = list(columns.values())
             # TODO: Take out from this function.
             self._schema = [{"name": col_name} for col_name in column_names]
 
@@ -854,27 +2499,142 @@ class DataSet:
 
         return data_orient_column
 
-    def _deserialize(self, data, orient):
+    def _convert_columns(self, columns, executor, stats=False):
+        """
+        Converts columns in the executor, splitting long columns into parts.
+        Returns the same Series as converted in this process.
+
+        :param stats: bool, the stats of the parts are summed into Series.stats
+        """
+        futures = []
+        for values, series_schema in columns:
+            parts = [
+                values[start : start + WORKER_CHUNK_ROWS]
+                for start in range(0, len(values), WORKER_CHUNK_ROWS)
+            ]
+            futures.append(
+                [
+                    executor.submit(_convert_column, part, series_schema, stats)
+                    for part in parts
+                ]
+            )
+
+        series_list = []
+        for (values, series_schema), column_futures in zip(columns, futures):
+            data = []
+            error_values = {}
+            parts_stats = []
+            for part_index, future in enumerate(column_futures):
+                part_data, part_error_values, part_stats = future.result()
+                data.extend(part_data)
+                offset = part_index * WORKER_CHUNK_ROWS
+                for index, value in part_error_values.items():
+                    error_values[offset + index] = value
+                if part_stats is not None:
+                    parts_stats.append(part_stats)
+
+            series = Series(**series_schema)
+            series._data = data
+            series.error_values = error_values
+            series._pack()
+            if stats:
+                # Seconds are the sum of the time of the parts in the workers.
+                series.stats = _sum_stats(
+                    "series", series.name, series._dtype, parts_stats
+                )
+            series_list.append(series)
+
+        return series_list
+
+    def _deserialize(self, data, orient, executor=None):
         if orient == "series":
             for i, series in enumerate(data):
                 series.name = series.name or str(i)
                 self._series.append(series)
             return
+
+        start = time.perf_counter()
+        count_rows = len(data[0]) if data and orient == "columns" else len(data)
         # TODO: What if you don't put the data into columns? even limiting functionality?
-        elif data and orient == "values":
-            data = self._rows_orient_data_to_columns(data)
-        elif data and orient == "dict":
-            data = self._dict_orient_data_to_columns(data)
+        if data and orient in ("values", "dict"):
+            if orient == "values":
+                data = self._rows_orient_data_to_columns(data)
+            else:
+                data = self._dict_orient_data_to_columns(data)
+            if self._stats_callback is not None:
+                self._stats_callback(
+                    ConversionStats(
+                        stage="columns",
+                        name=None,
+                        dtype=None,
+                        rows=count_rows,
+                        seconds=time.perf_counter() - start,
+                        nulls=None,
+                        errors=len(self.error_rows),
+                        cache_hits=None,
+                        cache_misses=None,
+                    )
+                )
+
+        if not isinstance(self._schema, Schema):
+            self._schema = Schema(self._schema, **self._series_defaults)
+        elif self._series_defaults:
+            self._schema = self._schema.with_defaults(**self._series_defaults)
+
+        if executor is None or self._lazy:
+            columns = zip(data, self._schema.columns)
+        else:
+            # Functions evaluated from strings can not be passed to another process.
+            columns = zip(data, self._schema.raw_columns)
+        if orient == "dict":
+            dict_columns = []
+            for values, schema in columns:
+                if "null_values" in schema:
+                    null_values = (None, *set(schema["null_values"]))
+                    schema = {**schema, "null_values": null_values}
+                dict_columns.append((values, schema))
+            columns = dict_columns
+
+        series_stats = []
+        if self._stats_callback is None:
+            series_kwargs = {}
+        else:
 
-        col_index_list = range(len(self._schema))
-        for col_index, values, series_schema in zip(col_index_list, data, self._schema):
-            series_schema["name"] = str(series_schema.get("name", col_index))
-            series_schema["dtype"] = series_schema.get("dtype", None)
-            if orient == "dict" and "null_values" in series_schema:
-                series_schema["null_values"] = (None, *set(series_schema["null_values"]))
-            self.add_or_update_series(Series(values, **series_schema))
+            def collect_series_stats(stats):
+                series_stats.append(stats)
+                self._stats_callback(stats)
 
-        self.print_stats(print_zero=False)
+            series_kwargs = {"stats_callback": collect_series_stats}
+
+        if executor is None or self._lazy:
+            series_list = [
+                Series(values, **schema, **series_kwargs) for values, schema in columns
+            ]
+        else:
+            series_list = self._convert_columns(
+                list(columns), executor, stats=bool(series_kwargs)
+            )
+            for series in series_list:
+                if series.stats is not None:
+                    series_kwargs["stats_callback"](series.stats)
+        for series in series_list:
+            # The series are new, so they are added without a copy,
+            # unlike add_or_update_series.
+            self._set_series(series)
+
+        if self._stats_callback is not None:
+            stats = _sum_stats(
+                "dataset", None, None, series_stats, seconds=time.perf_counter() - start
+            )
+            # Lazy series are not converted yet, their errors are unknown.
+            self._stats_callback(
+                stats._replace(
+                    rows=count_rows - len(self.error_rows),
+                    errors=None if self._lazy else self.error_count(),
+                )
+            )
+        if not self._lazy:
+            self.print_stats(print_zero=False)
 
     def rename_columns(self, new_columns):
         """
@@ -889,41 +2649,48 @@ class DataSet:
 
     def print_stats(self, print_zero=True):
         if print_zero or len(self.error_rows) > 0:
-            logging.warning(
+            _logger().warning(
                 "Rows were not included because the number of columns in the row is different: {}".format(
                     len(self.error_rows)
                 )
             )
         for series in self:
             if len(series.error_values) > 0:
-                logging.warning(
+                _logger().warning(
                     "Number of values converted to default: {}={}".format(
                         series.name, len(series.error_values)
                     )
                 )
 
     def error_count(self):
-        return len(self.get_errors())
+        return len(self._get_error_index_rows()) + len(self.error_rows)
 
-    def get_errors(self):
-        index_error_rows = self._get_error_index_rows()
-        data = []
-        for index_row in index_error_rows:
+    def iter_errors(self):
+        """
+        Yields rows with errors without building a DataSet.
+
+        :return: iterator of [error_column_index, row_data]
+        """
+        columns = [(series._data, series.error_values) for series in self]
+        for index_row in self._get_error_index_rows():
             index_columns = []
-            row = list(self[index_row : index_row + 1].to_values()[0])
-            for col_index, col_name in enumerate(self.columns):
-                error_value = self[col_name].error_values.get(index_row)
+            row = []
+            for col_index, (data, error_values) in enumerate(columns):
+                error_value = error_values.get(index_row)
                 if error_value:
                     index_columns.append(col_index)
                     # We return the original value.
-                    row[col_index] = error_value
-            data.append([index_columns, row])
+                    row.append(error_value)
+                else:
+                    row.append(data[index_row])
+            yield [index_columns, row]
 
         for row in self.error_rows:
-            data.append([[], row])
+            yield [[], row]
 
+    def get_errors(self):
         return DataSet(
-            data,
+            list(self.iter_errors()),
             schema=[{"name": "error_column_index"}, {"name": "row_data"}],
             orient="values",
         )
@@ -950,14 +2717,114 @@ class DataSet:
         return DataFrame(data, **kwargs)
 
     def to_text(self, sep="\t", newline="\n", add_column_names=True, dump_func=str):
-        func = lambda row: sep.join(map(dump_func, row))
-        text = newline.join(map(func, self.to_values()))
+        buffer = io.StringIO()
+        self.write_text(
+            buffer,
+            sep=sep,
+            newline=newline,
+            add_column_names=add_column_names,
+            dump_func=dump_func,
+        )
+        return buffer.getvalue()
+
+    def write_text(
+        self,
+        fileobj,
+        sep="\t",
+        newline="\n",
+        add_column_names=True,
+        dump_func=str,
+        chunk_rows=10000,
+        encoding="utf-8",
+    ):
+        """
+        Writes the text by chunks of rows, so the whole text is never built in memory.
+
+        :param fileobj: file object in text or binary mode
+        :param chunk_rows: int, number of rows formatted and written at once
+        :param encoding: str, used for binary file objects
+        """
+        write = _text_writer(fileobj, encoding)
 
         if add_column_names:
-            columns = sep.join(self.columns)
-            return "{}{}{}".format(columns, newline, text)
+            write(sep.join(self.columns) + newline)
+
+        func = lambda row: sep.join(map(dump_func, row))
+        delimiter = ""
+        for batch in self.iter_batches(chunk_rows):
+            write(delimiter + newline.join(map(func, batch)))
+            delimiter = newline
+
+    def write_clickhouse(
+        self, fileobj, fmt="TabSeparated", types=None, chunk_rows=10000
+    ):
+        """
+        Writes the rows in a ClickHouse input format, values are escaped
+        and formatted by the types of the columns.
+
+        :param fileobj: file object, in binary mode for RowBinary
+        :param fmt: str, TabSeparated|TabSeparatedWithNames|RowBinary
+        :param types: list of str, ClickHouse types of the columns,
+            by default they are derived from dtype, depth and allow_null of the series
+        :param chunk_rows: int, number of rows formatted and written at once
+        """
+        from . import clickhouse
+
+        clickhouse.write(self, fileobj, fmt=fmt, types=types, chunk_rows=chunk_rows)
+
+    def iter_batches(self, batch_rows=10000):
+        """
+        Returns rows by batches, so that all rows are never copied at once.
+
+        :return: generator of lists of tuples
+        """
+        for start in range(0, len(self), batch_rows):
+            yield list(zip(*self[start : start + batch_rows].to_list()))
+
+    def to_db(self, connection, table, batch_rows=10000, columns=None, paramstyle=None):
+        """
+        Inserts the rows into the table by batches through cursor.executemany.
+        The transaction is not committed.
+
+        :param connection: DB-API 2.0 connection
+        :param table: str, it is inserted into the query as is
+        :param columns: list, column names in the table, by default the dataset columns
+        :param paramstyle: str, qmark|numeric|named|format|pyformat,
+            by default the paramstyle of the connection module
+        :return: int, number of inserted rows
+        """
+        columns = self.columns if columns is None else columns
+        if len(columns) != len(self.columns):
+            raise ValueError("The number of columns does not match")
+        if paramstyle is None:
+            paramstyle = _db_paramstyle(connection)
+
+        if paramstyle == "qmark":
+            placeholders = ["?"] * len(columns)
+        elif paramstyle == "numeric":
+            placeholders = [":{}".format(i + 1) for i in range(len(columns))]
+        elif paramstyle == "named":
+            names = ["p{}".format(i) for i in range(len(columns))]
+            placeholders = [":{}".format(name) for name in names]
+        elif paramstyle in ("format", "pyformat"):
+            placeholders = ["%s"] * len(columns)
         else:
-            return text
+            raise ValueError("{} = неверный paramstyle".format(paramstyle))
+        query = "INSERT INTO {} ({}) VALUES ({})".format(
+            table, ", ".join(columns), ", ".join(placeholders)
+        )
+
+        count = 0
+        cursor = connection.cursor()
+        try:
+            for batch in self.iter_batches(batch_rows):
+                if paramstyle == "named":
+                    batch = [dict(zip(names, row)) for row in batch]
+                cursor.executemany(query, batch)
+                count += len(batch)
+        finally:
+            cursor.close()
+        return count
 
     def filter(self, filter_series):
         ds = DataSet()
@@ -965,6 +2832,92 @@ class DataSet:
             ds[series.name] = series.filter(filter_series).data()
         return ds
 
+    def take(self, indices):
+        """
+        Returns a dataset of rows at the indices, in their order.
+
+        :param indices: list of int
+        """
+        ds = DataSet()
+        for series in self:
+            ds._set_series(series.take(indices))
+        return ds
+
+    def sort_values(self, by, ascending=True, na_position="last"):
+        """
+        Returns a dataset sorted by the columns. The permutation of rows is computed
+        once and applied to every column, the values are not converted again.
+
+        :param by: str, list of str, names of the columns
+        :param ascending: bool, list of bool for each column
+        :param na_position: str, first|last, where null and NaN values are placed
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        if isinstance(ascending, bool):
+            ascending = [ascending] * len(by)
+        elif len(ascending) != len(by):
+            raise ValueError("The length of ascending does not match the length of by")
+
+        # The sort is stable, so sorting by the keys from the last one
+        # orders by all of them.
+        indices = range(len(self))
+        for col_name, col_ascending in reversed(list(zip(by, ascending))):
+            indices = _sort_indices(
+                indices, self[col_name].data(), col_ascending, na_position
+            )
+        return self.take(indices)
+
+    def _top_rows(self, select_func, n, columns):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        key_columns = [self[col_name].data() for col_name in columns]
+        if len(key_columns) == 1:
+            values = key_columns[0]
+            indices = (i for i in range(len(self)) if not _is_null(values[i]))
+            key = values.__getitem__
+        else:
+            indices = (
+                i
+                for i in range(len(self))
+                if not any(_is_null(values[i]) for values in key_columns)
+            )
+            key = lambda i: tuple(values[i] for values in key_columns)
+        return self.take(select_func(n, indices, key=key))
+
+    def nlargest(self, n, columns):
+        """
+        Returns n rows with the largest values of the columns, in descending order.
+        Rows with null or NaN values in the columns are skipped.
+        Works in O(rows * log(n)).
+
+        :param columns: str, list of str, compared in turn
+        """
+        return self._top_rows(heapq.nlargest, n, columns)
+
+    def nsmallest(self, n, columns):
+        """
+        Returns n rows with the smallest values of the columns, in ascending order,
+        like nlargest.
+        """
+        return self._top_rows(heapq.nsmallest, n, columns)
+
+    def index_on(self, col_name):
+        """
+        Builds a hash index of the column, to select rows by its values.
+        The index is not updated when the dataset is changed.
+
+        :return: ColumnIndex
+        """
+        return ColumnIndex(self, col_name)
+
+    def groupby(self, keys):
+        """
+        Groups rows by the values of the key columns, to aggregate them by GroupBy.agg.
+
+        :param keys: str, list of str, names of the key columns
+        :return: GroupBy
+        """
+        return GroupBy(self, keys)
+
     def distinct(self):
         return DataSet(set(zip(*self.to_list())), schema=self.schema, orient="values")
 
@@ -975,6 +2928,19 @@ class DataSet:
     def size(self):
         return sys.getsizeof(self._series)
 
+    def memory_usage(self, deep=False):
+        """
+        Returns the memory of the series in bytes.
+
+        :param deep: bool, like in Series.memory_usage, error_rows are counted too
+        """
+        size = sys.getsizeof(self._series) + sum(
+            series.memory_usage(deep=deep) for series in self._series
+        )
+        if deep:
+            size += _deep_sizeof(self.error_rows)
+        return size
+
     @property
     def num_rows(self):
         return len(self)
@@ -1027,7 +2993,8 @@ class DataSet:
         elif isinstance(key, slice):
             ds = DataSet()
             for series in self:
-                ds.add_or_update_series(series[key])
+                # Slices are views of the columns, so they are added without a copy.
+                ds._set_series(series[key])
             return ds
 
         try:
@@ -1035,24 +3002,25 @@ class DataSet:
         except ValueError:
             raise ValueError("There is no column with this name")
 
-    def __setitem__(self, col_name, data_or_series):
-        if len(self) == 0 or len(self) == len(data_or_series):
-            if isinstance(data_or_series, Series):
-                data_or_series = data_or_series.clone(name=col_name)
-            else:
-                data_or_series = Series(data=data_or_series, name=col_name)
-
-            if col_name in self.columns:
-                self._series[self.columns.index(col_name)] = data_or_series
+    def _set_series(self, series):
+        if len(self) == 0 or len(self) == len(series):
+            if series.name in self.columns:
+                self._series[self.columns.index(series.name)] = series
             else:
-                self._series.append(data_or_series)
-
+                self._series.append(series)
         else:
             raise Exception(
                 "The number of lines does not match. "
                 "You can add a new column, only of the same length."
             )
 
+    def __setitem__(self, col_name, data_or_series):
+        if isinstance(data_or_series, Series):
+            data_or_series = data_or_series.clone(name=col_name)
+        else:
+            data_or_series = Series(data=data_or_series, name=col_name)
+        self._set_series(data_or_series)
+
     def __delitem__(self, key):
         del self[key]
 
@@ -1090,3 +3058,272 @@ class DataSet:
         Mainly for IPython notebook.
         """
         return self.__repr__()
+
+
+def _db_paramstyle(connection):
+    """Returns the paramstyle of the DB-API module the connection belongs to."""
+    module_name = type(connection).__module__.split(".")[0]
+    return getattr(sys.modules.get(module_name), "paramstyle", "qmark")
+
+
+def _index_key(value):
+    """Lists can not be dict keys, so they are indexed as tuples."""
+    if isinstance(value, list):
+        return tuple(_index_key(i) for i in value)
+    return value
+
+
+class ColumnIndex:
+    """Positions of rows by the values of a dataset column."""
+
+    def __init__(self, dataset, col_name):
+        self.dataset = dataset
+        self.col_name = col_name
+        self._positions = {}
+        for index, value in enumerate(dataset[col_name]):
+            self._positions.setdefault(_index_key(value), []).append(index)
+
+    def __len__(self):
+        """Count distinct values."""
+        return len(self._positions)
+
+    def __contains__(self, key):
+        return _index_key(key) in self._positions
+
+    def lookup(self, key):
+        """Returns a list of row indices with this value."""
+        return list(self._positions.get(_index_key(key), []))
+
+    def get_rows(self, keys):
+        """
+        Returns a dataset of rows with these values, in the order of the keys.
+        Missing keys are skipped.
+        """
+        indices = []
+        for key in keys:
+            indices.extend(self._positions.get(_index_key(key), []))
+        return self.dataset.take(indices)
+
+
+class GroupBy:
+    """Rows of a dataset grouped by the key columns."""
+
+    def __init__(self, dataset, keys):
+        self.dataset = dataset
+        self.keys = [keys] if isinstance(keys, str) else list(keys)
+
+    def partial(self, spec):
+        """
+        Returns the aggregation of the rows, which can be updated by other chunks
+        and merged with other aggregations.
+
+        :return: Aggregation
+        """
+        return Aggregation(self.keys, spec).update(self.dataset)
+
+    def agg(self, spec):
+        """
+        Aggregates the groups in one pass over the columns.
+
+        :param spec: dict, {column: func or list of funcs}, funcs of AGG_FUNCS
+        :return: DataSet, key columns and aggregates, groups in the order of appearance
+        """
+        return self.partial(spec).result()
+
+
+def _update_sum(state, group_ids, values):
+    for group_id, value in zip(group_ids, values):
+        if value is not None:
+            total = state[group_id]
+            state[group_id] = value if total is None else total + value
+
+
+def _update_min(state, group_ids, values):
+    for group_id, value in zip(group_ids, values):
+        if value is not None:
+            current = state[group_id]
+            if current is None or value < current:
+                state[group_id] = value
+
+
+def _update_max(state, group_ids, values):
+    for group_id, value in zip(group_ids, values):
+        if value is not None:
+            current = state[group_id]
+            if current is None or value > current:
+                state[group_id] = value
+
+
+def _update_count(state, group_ids, values):
+    for group_id, value in zip(group_ids, values):
+        if value is not None:
+            state[group_id] += 1
+
+
+def _update_distinct(state, group_ids, values):
+    for group_id, value in zip(group_ids, values):
+        if value is not None:
+            state[group_id].add(_index_key(value))
+
+
+def _merge_count(state, group_ids, counts):
+    for group_id, count in zip(group_ids, counts):
+        state[group_id] += count
+
+
+def _merge_distinct(state, group_ids, sets):
+    for group_id, values in zip(group_ids, sets):
+        state[group_id] |= values
+
+
+# State of an aggregate: initial value of a group, update by values, merge of states.
+AGG_STATES = {
+    "sum": (lambda: None, _update_sum, _update_sum),
+    "min": (lambda: None, _update_min, _update_min),
+    "max": (lambda: None, _update_max, _update_max),
+    "count": (lambda: 0, _update_count, _merge_count),
+    "distinct": (set, _update_distinct, _merge_distinct),
+}
+# Aggregate functions and the states they are computed from.
+AGG_FUNCS = {
+    "sum": ("sum",),
+    "count": ("count",),
+    "min": ("min",),
+    "max": ("max",),
+    "mean": ("sum", "count"),
+    "count_distinct": ("distinct",),
+}
+
+
+class Aggregation:
+    """
+    Partial aggregates of groups. Chunks of a stream are added by update,
+    aggregations of different chunks or processes are combined by merge.
+    Null values are skipped, null keys make their own group.
+    """
+
+    def __init__(self, keys, spec):
+        """
+        :param keys: str, list of str, names of the key columns
+        :param spec: dict, {column: func or list of funcs}, funcs of AGG_FUNCS.
+            A column with one func keeps its name, with a list of funcs
+            or if it is a key the results are named {column}_{func}
+        """
+        self.keys = [keys] if isinstance(keys, str) else list(keys)
+        self.spec = spec
+        # (result name, column, func)
+        self._outputs = []
+        for col_name, funcs in spec.items():
+            names = [funcs] if isinstance(funcs, str) else list(funcs)
+            for func in names:
+                if func not in AGG_FUNCS:
+                    raise ValueError("{} = неверная функция агрегации".format(func))
+                if isinstance(funcs, str) and col_name not in self.keys:
+                    name = col_name
+                else:
+                    name = "{}_{}".format(col_name, func)
+                self._outputs.append((name, col_name, func))
+        # {(column, state name): list of states by group id}
+        self._states = {
+            (col_name, state_name): []
+            for _, col_name, func in self._outputs
+            for state_name in AGG_FUNCS[func]
+        }
+        self._group_ids = {}
+        # Values of the keys of each group, as they are in the dataset.
+        self._group_keys = []
+
+    def __len__(self):
+        """Count groups."""
+        return len(self._group_keys)
+
+    def _add_groups(self, keys, hashable_keys=None):
+        """
+        Returns the group id of each key, adding new groups.
+
+        :param hashable_keys: list, keys to look up, by default keys themselves
+        """
+        group_ids = self._group_ids
+        group_keys = self._group_keys
+        ids = []
+        for index, key in enumerate(keys):
+            hashable_key = key if hashable_keys is None else hashable_keys[index]
+            try:
+                group_id = group_ids.get(hashable_key)
+            except TypeError:
+                # Arrays are grouped as tuples.
+                if isinstance(key, tuple):
+                    hashable_key = tuple(map(_index_key, key))
+                else:
+                    hashable_key = _index_key(key)
+                group_id = group_ids.get(hashable_key)
+            if group_id is None:
+                group_id = group_ids[hashable_key] = len(group_keys)
+                group_keys.append(key)
+            ids.append(group_id)
+
+        for (_, state_name), state in self._states.items():
+            init = AGG_STATES[state_name][0]
+            state.extend(init() for _ in range(len(group_keys) - len(state)))
+        return ids
+
+    def update(self, dataset):
+        """
+        Adds the rows of the dataset.
+
+        :return: self
+        """
+        key_columns = [dataset[name].data() for name in self.keys]
+        keys = key_columns[0] if len(key_columns) == 1 else list(zip(*key_columns))
+        group_ids = self._add_groups(keys)
+
+        columns = {}
+        for (col_name, state_name), state in self._states.items():
+            if col_name not in columns:
+                columns[col_name] = dataset[col_name].data()
+            AGG_STATES[state_name][1](state, group_ids, columns[col_name])
+        return self
+
+    def merge(self, other):
+        """
+        Adds the groups of another aggregation with the same keys and spec.
+
+        :return: self
+        """
+        if other.keys != self.keys or other._outputs != self._outputs:
+            raise ValueError(
+                "Aggregations with different keys or spec can not be merged"
+            )
+        group_ids = self._add_groups(other._group_keys, list(other._group_ids))
+        for key, state in self._states.items():
+            AGG_STATES[key[1]][2](state, group_ids, other._states[key])
+        return self
+
+    def result(self):
+        """Returns a dataset of the key columns and the aggregates."""
+        if len(self.keys) == 1:
+            columns = [list(self._group_keys)]
+        elif self._group_keys:
+            columns = [list(i) for i in zip(*self._group_keys)]
+        else:
+            columns = [[] for _ in self.keys]
+
+        for _, col_name, func in self._outputs:
+            if func == "mean":
+                sums = self._states[(col_name, "sum")]
+                counts = self._states[(col_name, "count")]
+                columns.append(
+                    [
+                        None if count == 0 else total / count
+                        for total, count in zip(sums, counts)
+                    ]
+                )
+            elif func == "count_distinct":
+                columns.append(list(map(len, self._states[(col_name, "distinct")])))
+            else:
+                columns.append(list(self._states[(col_name, func)]))
+
+        names = self.keys + [name for name, _, _ in self._outputs]
+        return DataSet(
+            columns, schema=[{"name": name} for name in names], orient="columns"
+        )
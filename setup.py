@@ -36,7 +36,8 @@ setup(
     include_package_data=True,
     install_requires=["python-dateutil", "pytz"],
     extras_require={
-        "pandas": ["pandas"]
+        "pandas": ["pandas"],
+        "numpy": ["numpy"],
     },
     license="MIT",
     zip_safe=False,
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from datagun.aio import read_stream_chunks
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(stream, **kwargs):
+    return [ds async for ds in read_stream_chunks(stream, **kwargs)]
+
+
+async def iter_pieces(pieces):
+    for piece in pieces:
+        await asyncio.sleep(0)
+        yield piece
+
+
+SCHEMA = [{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "string"}]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 10])
+def test_stream_reader(chunk_rows):
+    async def main():
+        stream = asyncio.StreamReader()
+        stream.feed_data("1\tп\n2\tq\n\n3\tr".encode())
+        stream.feed_eof()
+        return await collect(stream, schema=SCHEMA, chunk_rows=chunk_rows)
+
+    chunks = run(main())
+    assert [len(ds) for ds in chunks] == [min(chunk_rows, 3 - i) for i in range(0, 3, chunk_rows)]
+    assert [row for ds in chunks for row in ds.to_values()] == [(1, "п"), (2, "q"), (3, "r")]
+
+
+def test_async_iterator():
+    # A multibyte character and rows are split between the pieces.
+    data = "a\tb\n1\tп\n2\tq\n".encode()
+    pieces = [data[i : i + 3] for i in range(0, len(data), 3)]
+    with ThreadPoolExecutor(2) as executor:
+        chunks = run(
+            collect(
+                iter_pieces(pieces),
+                schema=SCHEMA,
+                chunk_rows=1,
+                skip_begin_lines=1,
+                executor=executor,
+                max_pending=1,
+            )
+        )
+    assert [ds.to_values() for ds in chunks] == [[(1, "п")], [(2, "q")]]
+
+    chunks = run(collect(iter_pieces(["x;y\r\n", "z;w"]), sep=";", newline="\r\n"))
+    assert [row for ds in chunks for row in ds.to_values()] == [("x", "y"), ("z", "w")]
+
+
+def test_backpressure():
+    read_pieces = []
+
+    async def pieces():
+        for i in range(100):
+            read_pieces.append(i)
+            yield "{}\n".format(i)
+
+    async def main():
+        chunks = read_stream_chunks(pieces(), chunk_rows=1, max_pending=2)
+        first = await chunks.__anext__()
+        count_read = len(read_pieces)
+        await chunks.aclose()
+        return first, count_read
+
+    first, count_read = run(main())
+    assert first.to_values() == [("0",)]
+    assert count_read == 2
+
+
+def test_process_pool():
+    schema = [{"name": "a", "dtype": "int", "transform_func": "lambda x: x * 10"}]
+    with ProcessPoolExecutor(2) as executor:
+        chunks = run(
+            collect(iter_pieces(["1\n2\n", "3\n"]), schema=schema, chunk_rows=2, executor=executor)
+        )
+    assert [ds.to_values() for ds in chunks] == [[(10,), (20,)], [(30,)]]
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import datetime as dt
+import io
+import struct
+
+import pytest
+import pytz
+
+from datagun import DataSet
+from datagun import clickhouse
+
+
+def make_dataset():
+    data = [
+        ["1", "a\tb'c\\", "2020-01-02", "2020-01-02 03:04:05", "[1, 2]", "[['x'], []]"],
+        ["b", None, "2020-01-03", "1970-01-01 00:00:00", "[]", "[[\"it's\"]]"],
+    ]
+    schema = [
+        {"name": "i", "dtype": "int"},
+        {"name": "s", "dtype": "string", "allow_null": True},
+        {"name": "d", "dtype": "date"},
+        {"name": "t", "dtype": "datetime", "dt_format": "%Y-%m-%d %H:%M:%S"},
+        {"name": "a", "dtype": "int", "depth": 1},
+        {"name": "n", "dtype": "string", "depth": 2},
+    ]
+    return DataSet(data, schema=schema)
+
+
+def test_column_types():
+    assert clickhouse.column_types(make_dataset()) == [
+        "Int64",
+        "Nullable(String)",
+        "Date",
+        "DateTime",
+        "Array(Int64)",
+        "Array(Array(String))",
+    ]
+    ds = DataSet([[1, 1.5, None, [dt.date(2020, 1, 1)]]], depth=0)
+    assert clickhouse.column_types(ds) == ["Int64", "Float64", "String", "Array(Date)"]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_tab_separated(binary):
+    expected = (
+        "i\ts\td\tt\ta\tn\n"
+        "1\ta\\tb\\'c\\\\\t2020-01-02\t1577934245\t[1,2]\t[['x'],[]]\n"
+        "0\t\\N\t2020-01-03\t0\t[]\t[['it\\'s']]\n"
+    )
+    fileobj = io.BytesIO() if binary else io.StringIO()
+    make_dataset().write_clickhouse(fileobj, fmt="TabSeparatedWithNames", chunk_rows=1)
+    assert fileobj.getvalue() == (expected.encode() if binary else expected)
+
+    fileobj = io.StringIO()
+    make_dataset().write_clickhouse(fileobj)
+    assert fileobj.getvalue() == expected.split("\n", 1)[1]
+
+
+def test_row_binary():
+    expected = (
+        b"\x01\x00\x00\x00\x00\x00\x00\x00"
+        b"\x00\x06a\tb'c\\"
+        b"\x57\x47"
+        b"\xa5\x5d\x0d\x5e"
+        b"\x02\x01\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x00\x00\x00"
+        b"\x02\x01\x01x\x00"
+        b"\x00\x00\x00\x00\x00\x00\x00\x00"
+        b"\x01"
+        b"\x58\x47"
+        b"\x00\x00\x00\x00"
+        b"\x00"
+        b"\x01\x01\x04it's"
+    )
+    fileobj = io.BytesIO()
+    make_dataset().write_clickhouse(fileobj, fmt="RowBinary")
+    assert fileobj.getvalue() == expected
+
+
+def test_types():
+    moscow = pytz.timezone("Europe/Moscow")
+    ds = DataSet(
+        [[7, 0.5, None, moscow.localize(dt.datetime(2020, 1, 2, 6, 4, 5)), "x" * 200]]
+    )
+    types = ["Int32", "Float32", "Array(Nullable(UInt8))", "DateTime", "String"]
+
+    fileobj = io.BytesIO()
+    ds.write_clickhouse(fileobj, fmt="RowBinary", types=types)
+    assert fileobj.getvalue() == (
+        b"\x07\x00\x00\x00"
+        b"\x00\x00\x00\x3f"
+        b"\x00"
+        b"\xa5\x5d\x0d\x5e"
+        b"\xc8\x01" + b"x" * 200
+    )
+
+    fileobj = io.StringIO()
+    ds.write_clickhouse(fileobj, types=types)
+    assert fileobj.getvalue() == "7\t0.5\t\\N\t1577934245\t{}\n".format("x" * 200)
+
+    with pytest.raises(ValueError):
+        ds.write_clickhouse(io.StringIO(), types=["Decimal(10, 2)"] * 5)
+    with pytest.raises(ValueError):
+        ds.write_clickhouse(io.StringIO(), types=types[1:])
+    with pytest.raises(ValueError):
+        ds.write_clickhouse(io.StringIO(), fmt="CSV")
+
+
+def test_datetime_formats_match():
+    moscow = pytz.timezone("Europe/Moscow")
+    values = [
+        moscow.localize(dt.datetime(2020, 1, 2, 6, 4, 5)),
+        dt.datetime(2020, 1, 2, 3, 4, 5),
+        dt.date(2020, 1, 2),
+    ]
+    ds = DataSet([[value, [value]] for value in values], schema=[{"name": "t"}, {"name": "a"}])
+    types = ["DateTime", "Array(DateTime)"]
+
+    text = io.StringIO()
+    ds.write_clickhouse(text, types=types)
+    binary = io.BytesIO()
+    ds.write_clickhouse(binary, fmt="RowBinary", types=types)
+
+    rows = [line.split("\t") for line in text.getvalue().splitlines()]
+    binary_seconds = struct.unpack("<" + "I1xI" * len(values), binary.getvalue())
+    assert [int(t) for t, _ in rows] == list(binary_seconds[::2])
+    assert [int(a.strip("[']")) for _, a in rows] == list(binary_seconds[1::2])
+    assert binary_seconds[0] == binary_seconds[2] == 1577934245
+
+    with pytest.raises(ValueError, match="column t in row 0"):
+        DataSet([[dt.datetime(1960, 1, 1)]], schema=[{"name": "t"}]).write_clickhouse(
+            io.StringIO(), types=["DateTime"]
+        )
+
+
+def test_mixed_values():
+    ds = DataSet(
+        [["1", 1, 1, [1]], ["x", 2.5, "a", [2.5, None]]],
+        schema=[
+            {"name": "i", "dtype": "int", "errors": "ignore"},
+            {"name": "f"},
+            {"name": "s"},
+            {"name": "a", "depth": 1},
+        ],
+    )
+    assert clickhouse.column_types(ds) == ["String", "Float64", "String", "Array(Float64)"]
+
+    fileobj = io.StringIO()
+    ds.write_clickhouse(fileobj)
+    assert fileobj.getvalue() == "1\t1.0\t1\t[1.0]\nx\t2.5\ta\t[2.5,NULL]\n"
+
+
+def test_invalid_value():
+    ds = DataSet([[dt.date(2020, 1, 1)], [dt.date(1960, 1, 1)]], schema=[{"name": "d"}])
+    fileobj = io.BytesIO()
+    with pytest.raises(ValueError, match="column d in row 1"):
+        ds.write_clickhouse(fileobj, fmt="RowBinary", chunk_rows=1)
+    assert fileobj.getvalue() == b"\x56\x47"
+
+    with pytest.raises(ValueError, match="column d in row 0"):
+        DataSet([["a"]], schema=[{"name": "d"}]).write_clickhouse(io.StringIO(), types=["Int64"])
@@ -1,7 +1,14 @@
 # -*- coding: utf-8 -*-
+import datetime as dt
+import io
+import math
+import sqlite3
+
 import pytest
 
-from datagun import DataSet
+import datagun.datagun
+
+from datagun import Aggregation, ConversionStats, DataSet, Schema, read_jsonl, read_text_chunks
 
 
 def test_transpont():
@@ -121,6 +128,22 @@ def test_get_errors():
             index_cols, row = ds_error
             for index_col in index_cols:
                 assert row[index_col] in ["error_value", ["error_value"]]
+        assert [tuple(i) for i in ds.iter_errors()] == ds.get_errors().to_values()
+        assert ds.error_count() == len(ds.get_errors())
+
+
+def test_iter_errors():
+    ds = DataSet(
+        [["1", "x"], ["2", "y", "extra"], ["3", "z"], ["b", "w"]],
+        schema=[{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "int"}],
+    )
+    assert list(ds.iter_errors()) == [
+        [[1], [1, "x"]],
+        [[1], [3, "z"]],
+        [[0, 1], ["b", "w"]],
+        [[], ["2", "y", "extra"]],
+    ]
+    assert ds.error_count() == 4
 
 
 def test_to_data():
@@ -171,3 +194,377 @@ def test_rename_columns():
 
     data_shot.rename_columns({k: k + k for k in data_shot.columns})
     assert set(data_shot.columns).issubset({'aa', 'bb', 'cc'})
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 3, 10])
+@pytest.mark.parametrize("binary", [False, True])
+def test_read_text_chunks(chunk_rows, binary):
+    text = "a\tb\n1\t2\n\n3\t4\n5\t6\nend\tend\n"
+    buffer = io.BytesIO(text.encode("utf-8")) if binary else io.StringIO(text)
+    schema = [{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "int"}]
+
+    chunks = list(
+        read_text_chunks(
+            buffer, chunk_rows=chunk_rows, schema=schema, skip_begin_lines=1, skip_end_lines=1
+        )
+    )
+    assert all(len(chunk) <= chunk_rows for chunk in chunks)
+    assert sum(chunks[1:], chunks[0]).to_values() == [(1, 2), (3, 4), (5, 6)]
+    assert schema == [{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "int"}]
+
+
+def test_read_text_chunks_from_path(tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_text("1;2\r\n3;4", encoding="utf-8")
+
+    chunks = list(read_text_chunks(str(path), sep=";", newline="\r\n"))
+    assert [chunk.to_values() for chunk in chunks] == [[("1", "2"), ("3", "4")]]
+
+
+def test_workers(monkeypatch):
+    monkeypatch.setattr(datagun.datagun, "WORKER_CHUNK_ROWS", 3)
+    data = [
+        ["1", "a", None, "4", "5", "b", "7"],
+        ["2020-01-01", "x", "2020-01-03", "", "2020-01-05", "2020-01-06", "y"],
+        ["[1]", "['a', 2]", "[5]", "[]", "[[1]]", "[3]", "[4]"],
+        ["1", "2"],
+    ]
+    rows = [list(row) for row in zip(*data[:3])] + [data[3]]
+    schema = [
+        {"name": "a", "dtype": "int", "transform_func": "lambda x: x * 10"},
+        {"name": "b", "dtype": "date"},
+        {"name": "c", "dtype": "int", "depth": 1},
+    ]
+    ds_serial = DataSet(rows, schema=[dict(i) for i in schema])
+    ds = DataSet(rows, schema=[dict(i) for i in schema], workers=2)
+
+    assert ds.to_values() == ds_serial.to_values()
+    assert ds.error_rows == ds_serial.error_rows == [data[3]]
+    for col_name in ds.columns:
+        assert ds[col_name].error_values == ds_serial[col_name].error_values
+    assert ds.get_errors().to_values() == ds_serial.get_errors().to_values()
+
+    ds = DataSet(rows, schema=Schema(schema), workers=2)
+    assert ds.to_values() == ds_serial.to_values()
+
+
+def test_schema():
+    columns = [
+        {"name": "a", "dtype": "int", "transform_func": "lambda x: x * 10"},
+        {"dtype": "date", "errors": "default"},
+    ]
+    schema = Schema(columns, errors="raise", allow_null=True)
+    assert columns[1] == {"dtype": "date", "errors": "default"}
+    assert callable(schema.columns[0]["transform_func"][0])
+    assert [i["name"] for i in schema] == ["a", "1"]
+    assert [i["errors"] for i in schema] == ["raise", "default"]
+
+    for rows in ([["1", "2020-01-01"]], [["2", "x"], ["3", ""]]):
+        ds = DataSet(rows, schema=schema)
+        assert ds.columns == ["a", "1"]
+        assert ds["a"].data() == [int(row[0]) * 10 for row in rows]
+        expected = DataSet(rows, schema=[dict(i) for i in columns], errors="raise", allow_null=True)
+        assert ds.to_values() == expected.to_values()
+
+    ds = DataSet([["1", "x"]], schema=schema, null_value=0)
+    assert ds["a"].null_value == 0
+    assert "null_value" not in schema.columns[0]
+
+    plain = [dict(i) for i in columns]
+    DataSet([["1", "2020-01-01"]], schema=plain, errors="ignore")
+    assert plain == columns
+
+    with pytest.raises(ValueError):
+        Schema([{"dtype": "unknown"}])
+
+
+def test_lazy():
+    data = [["1", "a", "3"], ["2020-01-01", "2020-01-02", "2020-01-03"], ["x", "y", "z"]]
+    schema = [
+        {"name": "a", "dtype": "int"},
+        {"name": "b", "dtype": "date"},
+        {"name": "c", "dtype": "int", "errors": "raise"},
+    ]
+    ds = DataSet(data, schema=[dict(i) for i in schema], orient="columns", lazy=True)
+    assert len(ds) == 3
+    assert all(series._raw_data is not None for series in ds)
+
+    assert ds[["a", "b"]].to_text() == "a\tb\n1\t2020-01-01\n0\t2020-01-02\n3\t2020-01-03"
+    assert ds["c"]._raw_data is not None
+    assert ds["a"].error_values == {1: "a"}
+    with pytest.raises(ValueError):
+        ds["c"].data()
+
+
+def test_slice_view():
+    ds = DataSet([["1", "x"], ["b", "y"], ["3", "z"]], schema=[{"name": "a", "dtype": "int"}, {"name": "b"}])
+    sliced = ds[1:]
+    assert sliced.to_values() == [(0, "y"), (3, "z")]
+    assert sliced["a"].error_values == {0: "b"}
+
+    ds4 = DataSet(
+        [["1", "x"], ["b", "y"], ["3", "z"], ["d", "w"]],
+        schema=[{"name": "a", "dtype": "int"}, {"name": "b"}],
+    )
+    assert ds4[1:][1:]["a"].error_values == {1: "d"}
+    assert ds4[1:][1:].get_errors().to_values() == [([0], ["d", "w"])]
+
+    sliced["a"][1] = 30
+    assert ds.to_values() == [(1, "x"), (0, "y"), (3, "z")]
+    assert sliced.to_values() == [(0, "y"), (30, "z")]
+
+
+def test_index_on():
+    ds = DataSet(
+        [["1", "x"], ["2", "y"], ["1", "z"], ["[1]", "w"]],
+        schema=[{"name": "a"}, {"name": "b"}],
+    )
+    index = ds.index_on("a")
+    assert len(index) == 3
+    assert "1" in index and "3" not in index
+    assert index.lookup("1") == [0, 2]
+    assert index.lookup("3") == []
+    assert index.get_rows(["2", "3", "1"]).to_values() == [
+        ("2", "y"),
+        ("1", "x"),
+        ("1", "z"),
+    ]
+
+    ds = DataSet([[[1, 2]], [[3]]], schema=[{"name": "a", "dtype": "int", "depth": 1}])
+    assert ds.index_on("a").get_rows([[3]]).to_values() == [([3],)]
+
+
+@pytest.mark.parametrize("add_column_names", [True, False])
+@pytest.mark.parametrize("rows", [1, 5])
+def test_write_text(add_column_names, rows):
+    ds = DataSet(
+        [[str(i), "x{}".format(i)] for i in range(rows)],
+        schema=[{"name": "a", "dtype": "int"}, {"name": "b"}],
+    )
+    expected = "a,b\r\n" if add_column_names else ""
+    expected += "\r\n".join("{},x{}".format(i, i) for i in range(rows))
+    assert ds.to_text(sep=",", newline="\r\n", add_column_names=add_column_names) == expected
+
+    text_file = io.StringIO()
+    binary_file = io.BytesIO()
+    for fileobj in (text_file, binary_file):
+        ds.write_text(
+            fileobj,
+            sep=",",
+            newline="\r\n",
+            add_column_names=add_column_names,
+            chunk_rows=2,
+        )
+    assert text_file.getvalue() == expected
+    assert binary_file.getvalue() == expected.encode()
+
+
+@pytest.mark.parametrize("paramstyle", [None, "qmark", "numeric", "named"])
+def test_to_db(paramstyle):
+    ds = DataSet(
+        [[str(i), "x{}".format(i)] for i in range(5)],
+        schema=[{"name": "a", "dtype": "int"}, {"name": "b"}],
+    )
+    assert list(ds.iter_batches(2)) == [
+        [(0, "x0"), (1, "x1")],
+        [(2, "x2"), (3, "x3")],
+        [(4, "x4")],
+    ]
+
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE t (id INTEGER, name TEXT)")
+    assert ds.to_db(connection, "t", batch_rows=2, columns=["id", "name"], paramstyle=paramstyle) == 5
+    assert connection.execute("SELECT * FROM t").fetchall() == ds.to_values()
+
+    with pytest.raises(ValueError):
+        ds.to_db(connection, "t", columns=["id"])
+
+
+def test_dict_orient_sparse():
+    rows = [{"a": 1}, {"b": 2, "c": 3}, {}, {"a": 4, "c": 5}]
+    ds = DataSet(rows, orient="dict")
+    assert ds.columns == ["a", "b", "c"]
+    assert ds.to_values() == [(1, None, None), (None, 2, 3), (None, None, None), (4, None, 5)]
+
+
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("chunk_rows", [1, 2, 10])
+def test_read_jsonl(binary, chunk_rows):
+    text = '{"a": "1", "b": [1]}\n\n{"a": "x", "b": []}\r\n{"b": [2], "c": "z"}\n{"a": "3", "b": ["y"]}'
+    fileobj = io.BytesIO(text.encode()) if binary else io.StringIO(text)
+    schema = [{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "int", "depth": 1}]
+
+    chunks = list(read_jsonl(fileobj, schema=schema, chunk_rows=chunk_rows))
+    assert [len(ds) for ds in chunks] == [min(chunk_rows, 4 - i) for i in range(0, 4, chunk_rows)]
+    values = [row for ds in chunks for row in ds.to_values()]
+    assert values == [(1, [1]), (0, []), (0, [2]), (3, [0])]
+    assert chunks[0]["b"].data()[0] == [1]
+
+    fileobj.seek(0)
+    ds = next(read_jsonl(fileobj))
+    assert ds.columns == ["a", "b", "c"]
+
+    for schema in ([{"dtype": "int"}], Schema([{"dtype": "int"}])):
+        with pytest.raises(KeyError):
+            next(read_jsonl(io.StringIO('{"a": "1"}\n'), schema=schema))
+        with pytest.raises(KeyError):
+            DataSet([{"a": "1"}], schema=schema, orient="dict")
+
+
+def test_memory_usage():
+    ds = DataSet([["x" * 100, 1], ["y" * 100, 2]])
+    assert ds.memory_usage(deep=True) > ds.memory_usage() + 200
+    assert ds.memory_usage() >= ds.size
+
+
+@pytest.mark.parametrize("reader", ["text", "jsonl"])
+def test_max_memory_bytes(reader):
+    if reader == "text":
+        text = "".join("{}\t{}\n".format(i, "x" * 100) for i in range(1000))
+        read = lambda **kw: read_text_chunks(io.StringIO(text), **kw)
+    else:
+        text = "".join('{{"a": {}, "b": "{}"}}\n'.format(i, "x" * 100) for i in range(1000))
+        read = lambda **kw: read_jsonl(io.StringIO(text), **kw)
+
+    budget = 5000
+    chunks = list(read(chunk_rows=1000, max_memory_bytes=budget))
+    assert sum(map(len, chunks)) == 1000
+    assert len(chunks[0]) == datagun.datagun.MEMORY_PROBE_ROWS
+    assert all(ds.memory_usage(deep=True) <= budget * 1.5 for ds in chunks[1:])
+    assert len(list(read(chunk_rows=1000))) == 1
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_stats_callback(workers):
+    stats = []
+    schema = [{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "date"}]
+    data = [["1", "2020-01-01"], ["x", "2020-01-01"], ["3"]]
+    ds = DataSet(data, schema=schema, workers=workers, stats_callback=stats.append)
+
+    assert all(isinstance(i, ConversionStats) for i in stats)
+    assert [(i.stage, i.name) for i in stats] == [
+        ("columns", None),
+        ("series", "a"),
+        ("series", "b"),
+        ("dataset", None),
+    ]
+    assert stats[0].rows == 3 and stats[0].errors == 1
+    assert [i.errors for i in stats[1:3]] == [1, 0]
+    assert stats[-1].rows == len(ds) == 2
+    assert stats[-1].errors == ds.error_count() == 2
+    assert stats[-1].cache_hits + stats[-1].cache_misses == 2
+
+    stats = []
+    ds = DataSet(data[:2], schema=schema, lazy=True, stats_callback=stats.append)
+    assert [i.stage for i in stats] == ["columns", "dataset"]
+    assert stats[-1].errors is None
+    ds["a"].data()
+    assert stats[-1].stage == "series" and stats[-1].errors == 1
+
+
+def make_report():
+    data = [
+        ["2020-01-01", "a", "1", "1.5", "[1]"],
+        ["2020-01-01", "a", "2", None, "[1]"],
+        ["2020-01-02", "b", "3", "2", "[]"],
+        ["2020-01-01", "b", None, "4", "[1]"],
+    ]
+    schema = [
+        {"name": "date", "dtype": "date"},
+        {"name": "campaign"},
+        {"name": "clicks", "dtype": "int", "allow_null": True},
+        {"name": "cost", "dtype": "float", "allow_null": True},
+        {"name": "goals", "dtype": "int", "depth": 1},
+    ]
+    return DataSet(data, schema=schema)
+
+
+def test_groupby():
+    ds = make_report()
+    result = ds.groupby(["date", "campaign"]).agg(
+        {"clicks": "sum", "cost": ["sum", "mean", "count", "min", "max"], "campaign": "count_distinct"}
+    )
+    assert result.columns == [
+        "date", "campaign", "clicks", "cost_sum", "cost_mean", "cost_count", "cost_min", "cost_max",
+        "campaign_count_distinct",
+    ]
+    assert result.to_values() == [
+        (dt.date(2020, 1, 1), "a", 3, 1.5, 1.5, 1, 1.5, 1.5, 1),
+        (dt.date(2020, 1, 2), "b", 3, 2.0, 2.0, 1, 2.0, 2.0, 1),
+        (dt.date(2020, 1, 1), "b", None, 4.0, 4.0, 1, 4.0, 4.0, 1),
+    ]
+
+    result = ds.groupby("goals").agg({"campaign": "count_distinct", "clicks": "count"})
+    assert result.to_values() == [([1], 2, 2), ([], 1, 1)]
+
+    assert len(DataSet(schema=[{"name": "a"}]).groupby("a").agg({"a": "count"})) == 0
+    with pytest.raises(ValueError):
+        ds.groupby("date").agg({"clicks": "median"})
+
+
+def test_aggregation_merge():
+    ds = make_report()
+    spec = {"clicks": "sum", "cost": "mean", "campaign": "count_distinct"}
+    expected = ds.groupby("date").agg(spec).to_values()
+
+    streamed = Aggregation("date", spec)
+    for start in range(len(ds)):
+        streamed.update(ds.take([start]))
+    assert streamed.result().to_values() == expected
+
+    first = ds.take([0, 1]).groupby("date").partial(spec)
+    second = ds.take([2, 3]).groupby("date").partial(spec)
+    assert first.merge(second).result().to_values() == expected
+    assert len(first) == 2
+
+    with pytest.raises(ValueError):
+        first.merge(Aggregation("date", {"clicks": "max"}))
+
+
+def test_sort_values():
+    ds = DataSet([[3, "b"], [None, "a"], [1, "c"], [3, "a"], [2, None]], schema=[{"name": "x"}, {"name": "y"}])
+    assert ds.sort_values("x").to_values() == [(1, "c"), (2, None), (3, "b"), (3, "a"), (None, "a")]
+    assert ds.sort_values(["x", "y"], ascending=[False, True], na_position="first").to_values() == [
+        (None, "a"),
+        (3, "a"),
+        (3, "b"),
+        (2, None),
+        (1, "c"),
+    ]
+    assert ds["x"].sort_values(ascending=False).data() == [3, 3, 2, 1, None]
+
+    schema = [{"name": "x", "dtype": "float", "allow_null": True}]
+    ds = DataSet([["3"], ["nan"], ["1"], ["2"], [None]], schema=schema)
+    result = ds.sort_values("x")["x"].data()
+    assert result[:3] == [1.0, 2.0, 3.0]
+    assert math.isnan(result[3]) and result[4] is None
+    result = ds.sort_values("x", ascending=False, na_position="first")["x"].data()
+    assert math.isnan(result[0]) and result[1:] == [None, 3.0, 2.0, 1.0]
+
+    ds = DataSet([["b", 2], ["a", 1]], schema=[{"name": "c", "dtype": "category"}, {"name": "n"}])
+    result = ds.sort_values("n")
+    assert result["c"]._categorical() is not None
+    assert result.to_values() == [("a", 1), ("b", 2)]
+
+    with pytest.raises(ValueError):
+        ds.sort_values("x", na_position="middle")
+    with pytest.raises(ValueError):
+        ds.sort_values(["x", "y"], ascending=[True])
+
+    ds = DataSet([["2", "x"], ["1", "y"]], schema=[{"name": "a", "dtype": "int"}, {"name": "b", "dtype": "int"}])
+    result = ds.sort_values("a")
+    assert result.to_values() == [(1, 0), (2, 0)]
+    assert result["b"].error_values == {0: "y", 1: "x"}
+
+
+def test_nlargest():
+    ds = DataSet([[3, "b"], [None, "a"], [1, "c"], [3, "a"], [2, None]], schema=[{"name": "x"}, {"name": "y"}])
+    assert ds.nlargest(2, "x").to_values() == [(3, "b"), (3, "a")]
+    assert ds.nlargest(10, ["x", "y"]).to_values() == [(3, "b"), (3, "a"), (1, "c")]
+    assert ds.nsmallest(2, ["x", "y"]).to_values() == [(1, "c"), (3, "a")]
+    assert ds.nsmallest(0, "x").to_values() == []
+
+    schema = [{"name": "x", "dtype": "float", "allow_null": True}, {"name": "y"}]
+    ds = DataSet([["3", 1], ["nan", 2], ["1", 3], ["2", float("nan")]], schema=schema)
+    assert ds.nlargest(2, "x")["x"].data() == [3.0, 2.0]
+    assert ds.nsmallest(2, ["x", "y"]).to_values() == [(1.0, 3), (3.0, 1)]
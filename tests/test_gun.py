@@ -1 +1,37 @@
 # -*- coding: utf-8 -*-
+import pytest
+
+from datagun import Gun
+
+
+def to_uint(obj):
+    x = int(obj)
+    if x < 0:
+        raise ValueError
+    return x
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        dict(func=int, errors="default", default_value=0),
+        dict(func=int, errors="coerce"),
+        dict(func=int, errors="ignore", allow_null=True),
+        dict(func=to_uint, errors="default", default_value=0, allow_null=True, null_value="NULL"),
+        dict(func=str, errors="default", default_value="", clear_values=[0, "-"]),
+        dict(func=float, errors="coerce", clear_values=[0], null_value=-1),
+    ],
+)
+def test_map_same_as_call(params):
+    values = ["1", None, 2, -3, "a", 0, 4.5, "-", [], "NULL", None, "7"]
+    gun1, gun2 = Gun(**params), Gun(**params)
+
+    assert gun1.map(values) == [gun2(value) for value in values]
+    assert gun1.error_values == gun2.error_values
+
+
+def test_error_values_index():
+    gun = Gun(func=int, errors="coerce", allow_null=True)
+    gun.map([None, "a", None, "1", "b"])
+
+    assert gun.error_values == {1: "a", 4: "b"}
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+
+SCRIPT = """
+import sys
+import datagun
+print(" ".join(sorted(sys.modules)))
+"""
+
+
+def test_heavy_modules_are_lazy():
+    modules = subprocess.check_output([sys.executable, "-c", SCRIPT], universal_newlines=True)
+    loaded = {name.split(".")[0] for name in modules.split()}
+    assert not loaded & {"dateutil", "pytz", "json", "ast", "logging"}
+
+    from datagun import Series
+
+    series = Series(["2020-01-02 03:04:05"], dtype="datetime", timezone="Europe/Moscow")
+    assert series.data()[0].tzinfo.zone == "Europe/Moscow"
@@ -4,7 +4,9 @@ import datetime as dt
 import pytest
 import pytz
 
-from datagun import Series
+import datagun.datagun
+
+from datagun import Series, deserialize_list
 
 
 @pytest.mark.parametrize("timezone", [pytz.timezone("Europe/Moscow"), "Europe/Moscow"])
@@ -58,3 +60,306 @@ def test_multiple_conversion():
     assert data == ['1']
     assert [1] == data.to_int().data()
     assert ['1'] == data.to_string().data()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        ["2020-01-01", "2020-01-02", "2020-01-01"],
+        ["2020-01-01 10:00:00", "2020-01-02 23:59:59"],
+        ["20200131", "20200201"],
+        ["31.01.2020", "01.02.2020 10:00:00", "Jan 3 2020"],
+    ],
+)
+def test_to_datetime_infer(data):
+    expected = Series(data=data, dtype="datetime", errors="raise").data()
+    assert Series(data=data, dtype="datetime", dt_format="infer", errors="raise").data() == expected
+
+
+def test_to_datetime_infer_skips_nulls():
+    data = ["2020-01-01", "NULL", "--", "Jan", "2020-01-02"]
+    assert datagun.datagun._infer_datetime_format(data, ["NULL", "Jan"]) == "%Y-%m-%d"
+
+    params = dict(dtype="datetime", allow_null=True, clear_values=["--"])
+    series = Series(data=data, dt_format="infer", **params)
+    assert series.data() == Series(data=data, **params).data()
+    assert series.data()[-1] == dt.datetime(2020, 1, 2)
+
+
+def test_to_datetime_missing_date_parts():
+    today = dt.date.today()
+    for text in ["10:30", "Jan 3"]:
+        assert datagun.datagun._parse_full_datetime(text) is None
+        assert datagun.datagun._parse_datetime(text).year == today.year
+    assert datagun.datagun._parse_datetime("10:30").date() == today
+    assert datagun.datagun._parse_full_datetime("2020-01-03") == dt.datetime(2020, 1, 3)
+
+
+def test_to_datetime_dt_format():
+    series = Series(data=["01.02.2020", "2020-02-01"], dtype="datetime", dt_format="%d.%m.%Y")
+
+    assert series.data() == [dt.datetime(2020, 2, 1), dt.datetime(1970, 1, 1)]
+    assert series.error_values == {1: "2020-02-01"}
+
+
+@pytest.mark.parametrize(
+    "dtype,data,params",
+    [
+        ["int", ["1", None, "-2", "a"], dict(allow_null=True)],
+        ["uint", ["1", "2", "-2"], dict()],
+        ["float", ["1.5", "NULL", "2"], dict(allow_null=True, null_value="NULL")],
+        ["float", ["1.5", "a"], dict(errors="coerce")],
+        ["int", [str(2 ** 70), "1"], dict()],
+        ["int", ["1", "a"], dict(errors="ignore")],
+    ],
+)
+def test_array_storage(dtype, data, params):
+    series_list = Series(data=data, dtype=dtype, **params)
+    series = Series(data=data, dtype=dtype, storage="array", **params)
+
+    assert series.data() == series_list.data()
+    assert [type(i) for i in series.data()] == [type(i) for i in series_list.data()]
+    assert series.error_values == series_list.error_values
+    assert list(series) == series_list.data()
+    assert [series[i] for i in range(len(series))] == series_list.data()
+    assert series[1:].data() == series_list[1:].data()
+    assert series.append(series).data() == series_list.append(series_list).data()
+    mask = Series(data=[True, False] * len(data))
+    assert series.filter(mask).data() == series_list.filter(mask).data()
+
+
+def test_array_storage_mutation():
+    series = Series(data=["1", "2", "3"], dtype="int", storage="array", allow_null=True)
+    assert not isinstance(series._data, list)
+
+    series[0] = None
+    series[1] = 20
+    del series[2]
+    assert not isinstance(series._data, list)
+    assert series.data() == [None, 20]
+
+    series[0] = "a"
+    assert series.data() == ["a", 20]
+
+
+@pytest.mark.parametrize(
+    "dtype,data,other",
+    [
+        ["int", ["1", "-2", "3", "0"], 2],
+        ["int", ["1", "-2", "3", "0"], -1.5],
+        ["int", ["1", "-2", "3", "0"], ["4", "5", "-6", "7"]],
+        ["int", [str(2 ** 62), "1", "2", "3"], 2 ** 62],
+        ["uint", ["1", "2", "3", "4"], -5],
+        ["float", ["1.5", "-2", "nan", "0"], 0.5],
+        ["float", ["1.5", "-2", "nan", "0"], ["1", "2", "-3", "4"]],
+        ["float", ["1e308", "-2", "3", "0"], 10],
+    ],
+)
+def test_array_storage_operators(dtype, data, other):
+    series_list = Series(data=data, dtype=dtype)
+    series = Series(data=data, dtype=dtype, storage="array")
+    if isinstance(other, list):
+        other_list = Series(data=other, dtype=dtype)
+        other = Series(data=other, dtype=dtype, storage="array")
+    else:
+        other_list = other
+
+    for op in ["add", "sub", "mul", "truediv", "floordiv", "mod", "eq", "ne", "lt", "gt", "le", "ge"]:
+        op = "__{}__".format(op)
+        try:
+            expected = getattr(series_list, op)(other_list).data()
+        except ZeroDivisionError:
+            with pytest.raises(ZeroDivisionError):
+                getattr(series, op)(other)
+            continue
+        result = getattr(series, op)(other).data()
+        assert str(result) == str(expected), op
+        assert [type(i) for i in result] == [type(i) for i in expected], op
+
+    mask1, mask2 = series > 0, series < 2
+    mask1_list, mask2_list = series_list > 0, series_list < 2
+    assert (mask1 & mask2).data() == (mask1_list & mask2_list).data()
+    assert (mask1 | mask2).data() == (mask1_list | mask2_list).data()
+    assert (~mask1).data() == (~mask1_list).data()
+    assert series.filter(mask1).data() == series_list.filter(mask1_list).data()
+
+
+@pytest.mark.parametrize(
+    "text,result",
+    [
+        ["[1, 2.5, -3]", [1, 2.5, -3]],
+        ['["a", "b"]', ["a", "b"]],
+        ["['a', 'b']", ["a", "b"]],
+        ["[[1, 2], ['c']]", [[1, 2], ["c"]]],
+        ["[None, True]", [None, True]],
+        ["['it\\'s', \"a\"]", ["it's", "a"]],
+        ['["say "hello"", "ok"]', ['say "hello"', "ok"]],
+        ['["a\\\\"b", \'c"d\', ""]', ['a\\\\"b', 'c"d', ""]],
+    ],
+)
+def test_deserialize_list(text, result):
+    assert deserialize_list(text) == result
+
+
+@pytest.mark.parametrize("storage", ["list", "array"])
+@pytest.mark.parametrize("key", [slice(1, 4), slice(None, None, -2), slice(-3, None), slice(5, 1)])
+def test_slice_view(storage, key):
+    data = ["0", "a", "2", "3", "b", "5"]
+    series = Series(data=data, dtype="int", storage=storage)
+    expected = Series(data=data, dtype="int").data()[key]
+    rows = range(len(data))[key]
+
+    sliced = series[key]
+    assert sliced.data() == expected
+    assert list(sliced) == expected
+    assert sliced[1:].data() == expected[1:]
+    assert sliced.error_values == {
+        rows.index(index): value for index, value in {1: "a", 4: "b"}.items() if index in rows
+    }
+    assert sliced[1:].error_values == {
+        rows[1:].index(index): value
+        for index, value in {1: "a", 4: "b"}.items()
+        if index in rows[1:]
+    }
+
+    if expected:
+        sliced[0] = 100
+        series[rows[-1]] = 200
+        assert sliced.data() == [100] + expected[1:]
+        assert series.data()[rows[0]] != 100
+
+
+@pytest.mark.parametrize(
+    "value", [[1, "a", [2], None], (1, "a", [2], None), iter([1, "a", [2], None])]
+)
+def test_isin(value):
+    data = [1, 2, "a", [2], None, "ab", [[1]]]
+    expected = [True, False, True, True, True, False, False]
+    assert Series(data=data).isin(value).data() == expected
+    assert Series(data=["a", "ab", "c"]).isin("ab").data() == [True, True, False]
+
+
+@pytest.mark.parametrize("storage", ["list", "array"])
+def test_take(storage):
+    series = Series(data=["1", "a", "3"], dtype="int", storage=storage)
+    taken = series.take([2, -2, 0, 1])
+    assert taken.data() == [3, 0, 1, 0]
+    assert taken.error_values == {1: "a", 3: "a"}
+    assert type(taken._data) is type(series._data)
+
+
+def test_category():
+    data = ["ru", "en", "ru", None, "a", "1", "de"]
+    series = Series(data=data, dtype="category")
+    expected = Series(data=data, dtype="string")
+    assert series._categorical() is not None
+    assert series.data() == expected.data()
+    assert series.get_uniq_values() == expected.get_uniq_values()
+    assert (series == "ru").data() == (expected == "ru").data()
+    assert (series != "ru").data() == (expected != "ru").data()
+    assert series.isin(["ru", "de"]).data() == expected.isin(["ru", "de"]).data()
+    assert series[1:5].data() == expected[1:5].data()
+    assert (series[1:5] == "ru").data() == (expected[1:5] == "ru").data()
+
+    for result in (
+        series.replace_values(["ru", "en"], "x"),
+        series.filter(series == "ru"),
+        series.clone(),
+        series.take([4, 0, -1]),
+        series[1:].take([2, 0]),
+    ):
+        assert result._categorical() is not None
+
+    assert series.filter(series == "ru").data() == ["ru", "ru"]
+    assert series.take([4, 0, -1]).data() == ["a", "ru", "de"]
+    assert series[1:].take([2, 0]).data() == [expected.data()[3], "en"]
+    converted = series.to_int()
+    assert converted.data() == expected.to_int().data()
+    assert converted.error_values == expected.to_int().error_values
+
+    series[0] = "fr"
+    del series[1]
+    assert series.data() == ["fr"] + expected.data()[2:]
+    series[0] = 1
+    assert series.data() == [1] + expected.data()[2:]
+
+
+@pytest.mark.parametrize(
+    "data, depth",
+    [
+        (["[1, 2]", "[]", "['a', 3]", "[4.5]", "[None]"], 1),
+        (["[[1], [2, 'x']]", "[]", "[[]]", "[[3, None]]", "[[], ['y']]"], 2),
+    ],
+)
+def test_list_array_storage(data, depth):
+    series = Series(data=data, dtype="int", depth=depth, storage="array")
+    expected = Series(data=data, dtype="int", depth=depth)
+    assert isinstance(series._data, datagun.datagun._ListArray)
+    assert series.data() == expected.data()
+    assert series.error_values == expected.error_values
+    assert list(series) == expected.data()
+    assert series[-1] == expected.data()[-1]
+    assert series[1:4].data() == expected.data()[1:4]
+    assert series._data[::-2] == expected.data()[::-2]
+    assert series.filter(series != []).data() == [i for i in expected.data() if i != []]
+
+    converted = series.applymap(lambda value: value * 2)
+    assert isinstance(converted._data, datagun.datagun._ListArray)
+    assert converted.data() == expected.applymap(lambda value: value * 2).data()
+
+    series[0] = ["x"]
+    del series[1]
+    assert series.data() == [["x"]] + expected.data()[2:]
+
+
+def test_array_errors():
+    series = Series(data=["[1, 2]", "[]", "['a', 3]", "[[4]]"], dtype="int", depth=1)
+    assert series.data() == [[1, 2], [], [0, 3], [0]]
+    assert series.error_values == {2: ["a", 3], 3: [[4]]}
+    # Rows without errors are not marked by the next conversions.
+    assert series.applymap(str).error_values == series.error_values
+
+    series = Series(data=[["1", "2"], ["c"]], dtype="int", depth=1, clear_values={"2"}, default_value=-1)
+    assert series.data() == [[1, -1], [-1]]
+
+    with pytest.raises(TypeError):
+        Series(data=["5"], dtype="int", depth=1)
+
+
+def test_memory_usage():
+    values = ["x" * 100, "y" * 100, None]
+    series = Series(data=values)
+    assert series.memory_usage() == series.size
+    assert series.memory_usage(deep=True) > series.memory_usage() + 200
+
+    nested = Series(data=[["a" * 100, "b"], []], depth=1)
+    assert nested.memory_usage(deep=True) > nested.memory_usage() + 100
+
+    series = Series(data=["1", "x"], dtype="int", errors="default", error_values={1: "x" * 100})
+    assert series.memory_usage(deep=True) > series.memory_usage() + 100
+
+    lazy = Series(data=values, lazy=True)
+    assert lazy.memory_usage(deep=True) == Series(data=values).memory_usage(deep=True)
+    assert lazy._raw_data is not None
+
+    typed = Series(data=list(range(100)), dtype="int", storage="array")
+    assert typed.memory_usage() == typed.size
+    assert typed[:50].memory_usage(deep=True) < typed.memory_usage(deep=True)
+
+
+def test_stats_callback():
+    stats = []
+    series = Series(
+        data=["1", "x", None, "4"], dtype="int", allow_null=True, name="a", stats_callback=stats.append
+    )
+    assert stats == [series.stats]
+    assert series.stats.stage == "series"
+    assert (series.stats.name, series.stats.dtype, series.stats.rows) == ("a", "int", 4)
+    assert (series.stats.nulls, series.stats.errors) == (1, 1)
+    assert series.stats.seconds >= 0
+
+    assert Series(data=["1"], dtype="int").stats is None
+
+    stats = []
+    Series(data=["2020-01-01"] * 3, dtype="date", lazy=True, stats_callback=stats.append)
+    assert stats == []